@@ -6,15 +6,18 @@ and other API operations.
 """
 
 from fastapi import APIRouter, HTTPException, Depends
-from uuid import uuid4
+from fastapi.responses import ORJSONResponse
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import logging
+import os
 from typing import Optional
 
 from app.models.request_models import BOAPhotoRequest
-from app.models.response_models import BOAPhotoResponse, PhotoPayload
-from app.services.photo_service import get_photo_by_criteria
-from app.services.crypto import encrypt_photo_as_jwe
-from app.services.photo_processing import add_watermark_to_photo
+from app.models.response_models import BOAPhotoResponse
+from app.services.photo_service import get_photo_bytes_by_criteria
+from app.services.crypto import encrypt_photo_bytes_as_jwe, generate_transaction_id
+from app.services.photo_processing import add_watermark_to_photo_bytes
 from app.utils.exceptions import (
     BOAValidationError, 
     BOANotFoundError, 
@@ -23,16 +26,19 @@ from app.utils.exceptions import (
     PhotoProcessingError
 )
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Worker threads for CPU-bound photo processing and encryption, so these
+# steps do not block the event loop. Pillow and cryptography release the
+# GIL during their native work, so requests genuinely overlap.
+_CPU_POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+
 
 @router.post(
     "/boa/rijbewijs/pasfoto",
-    response_model=BOAPhotoResponse,
+    response_model=None,
     status_code=200,
     summary="Retrieve driver's license photo",
     description="""
@@ -56,6 +62,7 @@ router = APIRouter()
     """,
     responses={
         200: {
+            "model": BOAPhotoResponse,
             "description": "Photo successfully retrieved and encrypted",
             "content": {
                 "application/json": {
@@ -114,76 +121,80 @@ async def get_driver_photo(request: BOAPhotoRequest):
         request (BOAPhotoRequest): Photo request with BSN, birth date, and public key
         
     Returns:
-        BOAPhotoResponse: Response with transaction ID and encrypted photo
+        ORJSONResponse: BOAPhotoResponse-shaped body with transaction ID and encrypted photo
         
     Raises:
         HTTPException: For various error conditions (validation, not found, etc.)
     """
     # Generate unique transaction ID for audit trail
-    transaction_id = str(uuid4())
+    transaction_id = generate_transaction_id()
     
     logger.info(
-        f"Photo request received - Transaction ID: {transaction_id}, "
-        f"Pseudo ID: {request.pseudo_id_boa}"
+        "Photo request received - Transaction ID: %s, Pseudo ID: %s",
+        transaction_id,
+        request.pseudo_id_boa
     )
     
     try:
         # Step 1: Retrieve photo based on BSN and birth date
-        logger.info(f"Retrieving photo for BSN: {request.BSN[:3]}***{request.BSN[-2:]}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Retrieving photo for BSN: %s***%s", request.BSN[:3], request.BSN[-2:])
         
-        photo_data, photo_id = await get_photo_by_criteria(
+        photo_bytes, photo_id = await get_photo_bytes_by_criteria(
             bsn=request.BSN,
             birth_date=request.geboortedatum
         )
         
-        if not photo_data:
-            logger.warning(f"No photo found - Transaction ID: {transaction_id}")
+        if not photo_bytes:
+            logger.warning("No photo found - Transaction ID: %s", transaction_id)
             raise PhotoNotFoundError(request.BSN, request.geboortedatum)
         
-        logger.info(f"Photo found - Photo ID: {photo_id}, Transaction ID: {transaction_id}")
+        logger.info("Photo found - Photo ID: %s, Transaction ID: %s", photo_id, transaction_id)
         
         # Step 2: Add watermark to photo
-        logger.info(f"Adding watermark - Transaction ID: {transaction_id}")
-        
-        watermarked_photo = add_watermark_to_photo(
-            photo_data=photo_data,
-            transaction_id=transaction_id
-        )
-        
-        # Step 3: Create photo payload for encryption
-        photo_payload = PhotoPayload(
-            pasfoto=watermarked_photo,
-            format="jpg",
-            encoding="base64"
+        logger.info("Adding watermark - Transaction ID: %s", transaction_id)
+        
+        # The photo is stored pre-decoded and stays in raw bytes until the
+        # JWE payload is built, so it is base64-encoded only once
+        loop = asyncio.get_running_loop()
+        watermarked_photo = await loop.run_in_executor(
+            _CPU_POOL,
+            add_watermark_to_photo_bytes,
+            photo_bytes,
+            transaction_id
         )
         
-        # Step 4: Encrypt photo using JWE with client's public key
-        logger.info(f"Encrypting photo - Transaction ID: {transaction_id}")
-        
-        jwe_token = encrypt_photo_as_jwe(
-            photo_payload=photo_payload.dict(),
-            public_key=request.ontvanger_publieke_sleutel.dict()
-        )
+        # Step 3: Encrypt photo using JWE with client's public key
+        logger.info("Encrypting photo - Transaction ID: %s", transaction_id)
         
-        # Step 5: Create and return response
-        response = BOAPhotoResponse(
-            transactie_id=transaction_id,
-            pasfoto_id=photo_id,
-            pasfoto_jwe=jwe_token
+        # The validated JWK model's field dict is already a flat mapping of
+        # strings, so it is passed as-is instead of building a copy via model_dump()
+        jwe_token = await loop.run_in_executor(
+            _CPU_POOL,
+            encrypt_photo_bytes_as_jwe,
+            watermarked_photo,
+            request.ontvanger_publieke_sleutel.__dict__
         )
         
         logger.info(
-            f"Photo request completed successfully - Transaction ID: {transaction_id}"
+            "Photo request completed successfully - Transaction ID: %s", transaction_id
         )
         
-        return response
+        # Step 4: Return the response in BOAPhotoResponse (aliased) form.
+        # All three values are known-valid, so the dict is serialized as-is
+        # without a Pydantic validation pass.
+        return ORJSONResponse(content={
+            "transactie-id": transaction_id,
+            "pasfoto-id": photo_id,
+            "pasfoto-jwe": jwe_token
+        })
         
     except PhotoNotFoundError:
         # Re-raise to be handled by the exception handler
         raise
         
     except (EncryptionError, PhotoProcessingError) as e:
-        logger.error(f"Processing error - Transaction ID: {transaction_id}, Error: {str(e)}")
+        logger.error("Processing error - Transaction ID: %s, Error: %s", transaction_id, e)
         raise HTTPException(
             status_code=500,
             detail=f"Photo processing failed: {str(e)}"
@@ -191,7 +202,9 @@ async def get_driver_photo(request: BOAPhotoRequest):
         
     except Exception as e:
         logger.error(
-            f"Unexpected error - Transaction ID: {transaction_id}, Error: {str(e)}",
+            "Unexpected error - Transaction ID: %s, Error: %s",
+            transaction_id,
+            e,
             exc_info=True
         )
         raise HTTPException(
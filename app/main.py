@@ -5,9 +5,12 @@ This module initializes the FastAPI application with proper configuration,
 middleware, and routing for the BOA driver's license register API.
 """
 
+import logging
+
 from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException
 
@@ -17,6 +20,9 @@ from app.utils.config import get_settings
 
 settings = get_settings()
 
+# Configure logging once for the whole application
+logging.basicConfig(level=settings.log_level.upper())
+
 app = FastAPI(
     title="BOA API - RDW Rijbewijzenregister",
     description="""
@@ -53,15 +59,17 @@ app = FastAPI(
     },
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
-# CORS middleware
+# CORS middleware; only the headers the BOA endpoints accept are allowed,
+# so requests are matched against a fixed set instead of mirroring any header
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.allowed_origins,
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST"],
-    allow_headers=["*"],
+    allow_headers=["content-type", "authorization"],
 )
 
 # Include API routes
@@ -71,7 +79,7 @@ app.include_router(router, prefix="/api")
 @app.exception_handler(BOAValidationError)
 async def validation_exception_handler(request, exc: BOAValidationError):
     """Handle custom validation errors."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={
             "error": "Validation Error",
@@ -84,7 +92,7 @@ async def validation_exception_handler(request, exc: BOAValidationError):
 @app.exception_handler(BOANotFoundError)
 async def not_found_exception_handler(request, exc: BOANotFoundError):
     """Handle not found errors."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=404,
         content={
             "error": "Not Found",
@@ -97,12 +105,13 @@ async def not_found_exception_handler(request, exc: BOANotFoundError):
 @app.exception_handler(RequestValidationError)
 async def request_validation_exception_handler(request, exc: RequestValidationError):
     """Handle Pydantic validation errors."""
-    return JSONResponse(
+    # errors() can carry the raised exception object in its ctx
+    return ORJSONResponse(
         status_code=422,
         content={
             "error": "Request Validation Error",
             "message": "Invalid request data",
-            "details": exc.errors(),
+            "details": jsonable_encoder(exc.errors()),
             "type": "request_validation_error"
         }
     )
@@ -111,7 +120,7 @@ async def request_validation_exception_handler(request, exc: RequestValidationEr
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc: HTTPException):
     """Handle HTTP exceptions."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": "HTTP Error",
@@ -124,7 +133,7 @@ async def http_exception_handler(request, exc: HTTPException):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc: Exception):
     """Handle all other exceptions."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
@@ -173,10 +182,16 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
+    # loop/http "auto" select uvloop and httptools (installed with
+    # uvicorn[standard]) and fall back to asyncio/h11 where unavailable.
+    # Multiple workers cannot be combined with auto-reload.
     uvicorn.run(
         "app.main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        workers=1 if settings.debug else settings.workers,
+        loop="auto",
+        http="auto",
         log_level="debug" if settings.debug else "info"
     )
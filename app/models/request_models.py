@@ -4,9 +4,37 @@ Request models for BOA API.
 This module defines Pydantic models for validating incoming API requests.
 """
 
-from typing import Dict, Any
-from pydantic import BaseModel, Field, validator
-from app.services.validation import validate_bsn, validate_birth_date, validate_public_key
+from typing import Annotated, Literal
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, field_validator
+from app.services.validation import (
+    P256_COORDINATE_B64_LENGTH,
+    passes_11_proef,
+    validate_birth_date,
+    validate_public_key,
+)
+from app.utils.exceptions import BSNValidationError
+
+# Format constraints are enforced by pydantic-core before any Python
+# validator runs, so malformed input is rejected without Python callbacks
+BSNStr = Annotated[
+    str,
+    StringConstraints(min_length=9, max_length=9, pattern=r"^[0-9]{9}$")
+]
+BirthDateStr = Annotated[
+    str,
+    StringConstraints(
+        min_length=10,
+        max_length=10,
+        pattern=r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$|^\d{4}-00-00$"
+    )
+]
+CoordinateStr = Annotated[
+    str,
+    StringConstraints(
+        min_length=P256_COORDINATE_B64_LENGTH,
+        max_length=P256_COORDINATE_B64_LENGTH
+    )
+]
 
 
 class JWKPublicKey(BaseModel):
@@ -16,36 +44,14 @@ class JWKPublicKey(BaseModel):
     Validates that the provided key is an EC key with P-256 curve.
     """
     
-    kty: str = Field(..., description="Key type, must be 'EC'")
-    crv: str = Field(..., description="Curve, must be 'P-256'")
-    x: str = Field(..., description="X coordinate of the EC point")
-    y: str = Field(..., description="Y coordinate of the EC point")
+    kty: Literal["EC"] = Field(..., description="Key type, must be 'EC'")
+    crv: Literal["P-256"] = Field(..., description="Curve, must be 'P-256'")
+    x: CoordinateStr = Field(..., description="X coordinate of the EC point")
+    y: CoordinateStr = Field(..., description="Y coordinate of the EC point")
     
-    @validator('kty')
-    def validate_key_type(cls, v):
-        """Validate that key type is EC."""
-        if v != 'EC':
-            raise ValueError("Key type must be 'EC'")
-        return v
-    
-    @validator('crv')
-    def validate_curve(cls, v):
-        """Validate that curve is P-256."""
-        if v != 'P-256':
-            raise ValueError("Curve must be 'P-256'")
-        return v
-    
-    @validator('x', 'y')
-    def validate_coordinate(cls, v):
-        """Validate that coordinates are valid base64url strings."""
-        if not v or not isinstance(v, str):
-            raise ValueError("Coordinate must be a non-empty string")
-        return v
-    
-    class Config:
-        """Pydantic model configuration."""
-        populate_by_name = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        populate_by_name=True,
+        json_schema_extra={
             "example": {
                 "kty": "EC",
                 "crv": "P-256",
@@ -53,6 +59,7 @@ class JWKPublicKey(BaseModel):
                 "y": "WPUY5Dq7qT_kJP3U4EYm70BzRRnyMTTXhQsXpHSdkKQ"
             }
         }
+    )
 
 
 class BOAPhotoRequest(BaseModel):
@@ -63,18 +70,14 @@ class BOAPhotoRequest(BaseModel):
     the BOA interface specification.
     """
     
-    BSN: str = Field(
+    BSN: BSNStr = Field(
         ..., 
-        description="9-digit BSN (Burgerservicenummer) with valid 11-proef",
-        min_length=9,
-        max_length=9,
-        pattern=r"^\d{9}$"
+        description="9-digit BSN (Burgerservicenummer) with valid 11-proef"
     )
     
-    geboortedatum: str = Field(
+    geboortedatum: BirthDateStr = Field(
         ..., 
-        description="Birth date in ISO 8601 format (YYYY-MM-DD or YYYY-00-00)",
-        pattern=r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$|^\d{4}-00-00$"
+        description="Birth date in ISO 8601 format (YYYY-MM-DD or YYYY-00-00)"
     )
     
     pseudo_id_boa: str = Field(
@@ -91,31 +94,38 @@ class BOAPhotoRequest(BaseModel):
         alias="ontvanger-publieke-sleutel"
     )
     
-    @validator('BSN')
+    @field_validator('BSN')
+    @classmethod
     def validate_bsn_field(cls, v):
-        """Validate BSN using 11-proef algorithm."""
-        if not validate_bsn(v):
-            raise ValueError("Invalid BSN: failed 11-proef validation")
+        """
+        Validate BSN using 11-proef algorithm.
+        
+        The 9-digit format is already enforced by the field pattern, which
+        runs first, so only the checksum is computed here.
+        """
+        if not passes_11_proef(v):
+            raise BSNValidationError(v, "Failed 11-proef validation")
         return v
     
-    @validator('geboortedatum')
+    @field_validator('geboortedatum')
+    @classmethod
     def validate_birth_date_field(cls, v):
         """Validate birth date format."""
         if not validate_birth_date(v):
             raise ValueError("Invalid birth date format")
         return v
     
-    @validator('ontvanger_publieke_sleutel')
+    @field_validator('ontvanger_publieke_sleutel')
+    @classmethod
     def validate_public_key_field(cls, v):
         """Validate public key structure and format."""
-        if not validate_public_key(v.dict()):
+        if not validate_public_key(v.__dict__):
             raise ValueError("Invalid public key format or parameters")
         return v
     
-    class Config:
-        """Pydantic model configuration."""
-        populate_by_name = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        populate_by_name=True,
+        json_schema_extra={
             "example": {
                 "BSN": "123456789",
                 "geboortedatum": "2000-08-16",
@@ -128,3 +138,4 @@ class BOAPhotoRequest(BaseModel):
                 }
             }
         }
+    )
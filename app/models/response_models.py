@@ -6,7 +6,7 @@ All models include comprehensive validation and documentation.
 """
 
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class BOAPhotoResponse(BaseModel):
@@ -34,16 +34,16 @@ class BOAPhotoResponse(BaseModel):
         alias="pasfoto-jwe"
     )
     
-    class Config:
-        """Pydantic model configuration."""
-        populate_by_name = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        populate_by_name=True,
+        json_schema_extra={
             "example": {
                 "transactie-id": "7bdba0d1-bc9b-4e2a-b69e-4308a8373d32",
                 "pasfoto-id": 1,
                 "pasfoto-jwe": "eyJhbGciOiJFQ0RILUVTIiwiZW5jIjoiQTI1NkdDTSIsImVwayI6eyJrdHkiOiJFQyIsImNydiI6IlAtMjU2IiwieCI6InRyV0pzVGZKSWdMdXU3UWJnSzUxRGJqM0c5SE1oZmlVdjdReFlkQXRmT1EiLCJ5IjoiWGJGTWl4dzVMeU5GaklPV0lYQkptZDFGaWduMzZJeWNqQktScXd4S1RfUSJ9fQ..K_5O9BUGxdq2rJAo.encrypted_payload_here.tag_here"
             }
         }
+    )
 
 
 class PhotoPayload(BaseModel):
@@ -68,15 +68,15 @@ class PhotoPayload(BaseModel):
         description="Encoding type for photo data"
     )
     
-    class Config:
-        """Pydantic model configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "pasfoto": "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAoHBwgHBgoICAgLCgoLDhgQDg0NDh0VFhEYIx8lJCIfIiEmKzcvJik0KSEiMEExNDk7Pj4+JS5ESUM8SDc9Pjv/2wBDAQoLCw4NDhwQEBw7KCIoOzs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozv/wAARCAABAAEDASIAAhEBAxEB/8QAFQABAQAAAAAAAAAAAAAAAAAAAAv/xAAUEAEAAAAAAAAAAAAAAAAAAAAA/8QAFQEBAQAAAAAAAAAAAAAAAAAAAAX/xAAUEQEAAAAAAAAAAAAAAAAAAAAA/9oADAMBAAIRAxEAPwCdABmX/9k=",
                 "format": "jpg",
                 "encoding": "base64"
             }
         }
+    )
 
 
 class ErrorResponse(BaseModel):
@@ -91,9 +91,8 @@ class ErrorResponse(BaseModel):
     type: str = Field(..., description="Error category")
     details: Optional[dict] = Field(None, description="Additional error details")
     
-    class Config:
-        """Pydantic model configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "error": "Validation Error",
                 "message": "Invalid BSN: failed 11-proef validation",
@@ -104,6 +103,7 @@ class ErrorResponse(BaseModel):
                 }
             }
         }
+    )
 
 
 class HealthResponse(BaseModel):
@@ -118,9 +118,8 @@ class HealthResponse(BaseModel):
     version: str = Field(..., description="Service version")
     environment: str = Field(..., description="Runtime environment")
     
-    class Config:
-        """Pydantic model configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "healthy",
                 "service": "BOA API",
@@ -128,3 +127,4 @@ class HealthResponse(BaseModel):
                 "environment": "development"
             }
         }
+    )
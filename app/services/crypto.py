@@ -4,53 +4,283 @@ Cryptographic services for BOA API.
 This module handles JWE encryption and decryption operations using
 ECDH-ES key exchange and AES256GCM encryption as specified in the
 BOA interface requirements.
-
-Simplified implementation using available libraries.
 """
 
-import json
-import base64
+import pybase64 as base64
+import os
+import queue
 import secrets
+import threading
+import uuid
+from collections import deque
+from functools import lru_cache
 from typing import Dict, Any
-from jose import jwe, jwk
+import orjson
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.concatkdf import ConcatKDFHash
 from app.utils.exceptions import EncryptionError
+from app.utils.config import get_settings
+
+settings = get_settings()
+
+# JWE parameters from the BOA interface description
+JWE_ALGORITHM = "ECDH-ES"
+JWE_ENCRYPTION = "A256GCM"
+
+CEK_LENGTH = 32  # 256-bit content encryption key
+IV_LENGTH = 12  # 96-bit GCM nonce
+COORDINATE_LENGTH = 32  # P-256 coordinate size in bytes
+
+# Reusable ciphertext buffers; photos larger than the buffer size get a
+# one-off buffer that is not pooled
+BUFFER_POOL_SIZE = 4
+BUFFER_SIZE = 256 * 1024
+
+_buffer_pool: queue.Queue = queue.Queue(maxsize=BUFFER_POOL_SIZE)
+for _ in range(BUFFER_POOL_SIZE):
+    _buffer_pool.put_nowait(bytearray(BUFFER_SIZE))
+
+# Size of each os.urandom refill when the buffered RNG is enabled
+RNG_BUFFER_SIZE = 4096
+
+_rng_buffer = bytearray()
+_rng_lock = threading.Lock()
+
+# Transaction IDs are generated in batches of this size
+TRANSACTION_ID_BATCH_SIZE = 256
+
+# Pre-generated transaction IDs; deque append/pop are thread-safe
+_transaction_ids: deque = deque()
+
+
+def _b64url_encode(data: bytes) -> str:
+    """Encode bytes as unpadded base64url (RFC 7515 section 2)."""
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64url_decode(data: str) -> bytes:
+    """Decode unpadded base64url data."""
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _rand_bytes(n: int) -> bytes:
+    """
+    Return n cryptographically secure random bytes.
+    
+    With the buffered_rng setting enabled, bytes are served from an
+    in-process buffer refilled from os.urandom, so one getrandom syscall
+    covers many encryptions. Otherwise this is secrets.token_bytes.
+    """
+    if not settings.buffered_rng:
+        return secrets.token_bytes(n)
+    
+    with _rng_lock:
+        if len(_rng_buffer) < n:
+            _rng_buffer.extend(os.urandom(max(RNG_BUFFER_SIZE, n)))
+        out = bytes(_rng_buffer[:n])
+        # Drop served bytes so they are never handed out twice
+        del _rng_buffer[:n]
+    return out
+
+
+def _length_prefixed(data: bytes) -> bytes:
+    """Prefix data with its 32-bit big-endian length (RFC 7518 section 4.6.2)."""
+    return len(data).to_bytes(4, 'big') + data
+
+
+# Concat KDF OtherInfo for direct key agreement: AlgorithmID is the "enc"
+# value, PartyUInfo/PartyVInfo are empty and SuppPubInfo is the key length
+# in bits. This is identical for every request, so build it once.
+_CONCAT_KDF_OTHER_INFO = (
+    _length_prefixed(JWE_ENCRYPTION.encode('ascii'))
+    + _length_prefixed(b'')
+    + _length_prefixed(b'')
+    + (CEK_LENGTH * 8).to_bytes(4, 'big')
+)
+
+
+def _decode_public_key(x: str, y: str) -> ec.EllipticCurvePublicKey:
+    """Construct an EC P-256 public key from its JWK coordinates."""
+    x_value = int.from_bytes(_b64url_decode(x), 'big')
+    y_value = int.from_bytes(_b64url_decode(y), 'big')
+    return ec.EllipticCurvePublicNumbers(x_value, y_value, ec.SECP256R1()).public_key()
+
+
+@lru_cache(maxsize=1024)
+def load_public_key(x: str, y: str) -> ec.EllipticCurvePublicKey:
+    """
+    Load a client (recipient) EC P-256 public key from its JWK coordinates.
+    
+    BOAs present the same key on many requests, so parsed keys are cached
+    to skip the base64url decoding and point validation on repeat calls.
+    Validation loads the key through this function as well, so the
+    encryption step gets it from the cache. Key objects are immutable and
+    safe to share between threads.
+    
+    Args:
+        x: Base64url encoded X coordinate
+        y: Base64url encoded Y coordinate
+        
+    Returns:
+        The public key
+        
+    Raises:
+        ValueError: If the coordinates are not a point on P-256
+    """
+    return _decode_public_key(x, y)
+
+
+def _public_key_to_jwk(public_key: ec.EllipticCurvePublicKey) -> Dict[str, str]:
+    """Export an EC P-256 public key as a JWK dictionary."""
+    numbers = public_key.public_numbers()
+    return {
+        "kty": "EC",
+        "crv": "P-256",
+        "x": _b64url_encode(numbers.x.to_bytes(COORDINATE_LENGTH, 'big')),
+        "y": _b64url_encode(numbers.y.to_bytes(COORDINATE_LENGTH, 'big'))
+    }
+
+
+def _borrow_buffer(size: int) -> bytearray:
+    """Take a buffer of at least `size` bytes, from the pool when possible."""
+    if size <= BUFFER_SIZE:
+        try:
+            return _buffer_pool.get_nowait()
+        except queue.Empty:
+            pass
+    return bytearray(max(size, BUFFER_SIZE))
+
+
+def _return_buffer(buffer: bytearray) -> None:
+    """Hand a pool-sized buffer back to the pool; other buffers are dropped."""
+    if len(buffer) == BUFFER_SIZE:
+        try:
+            _buffer_pool.put_nowait(buffer)
+        except queue.Full:
+            pass
+
+
+def _derive_cek(shared_secret: bytes) -> bytes:
+    """Derive the content encryption key from an ECDH shared secret."""
+    kdf = ConcatKDFHash(
+        algorithm=hashes.SHA256(),
+        length=CEK_LENGTH,
+        otherinfo=_CONCAT_KDF_OTHER_INFO
+    )
+    return kdf.derive(shared_secret)
+
+
+def _encrypt_compact(plaintext: bytes, public_key: Dict[str, str]) -> str:
+    """
+    Encrypt plaintext for the given public key as a compact ECDH-ES/A256GCM JWE.
+    
+    Args:
+        plaintext: Bytes to encrypt
+        public_key: JWK format public key of the recipient
+        
+    Returns:
+        JWE token string (compact serialization)
+    """
+    # ECDH-ES key agreement with an ephemeral key
+    peer_key = load_public_key(public_key["x"], public_key["y"])
+    ephemeral_key = ec.generate_private_key(ec.SECP256R1())
+    cek = _derive_cek(ephemeral_key.exchange(ec.ECDH(), peer_key))
+    
+    # Protected header doubles as additional authenticated data
+    header = create_jwe_header(_public_key_to_jwk(ephemeral_key.public_key()))
+    protected = _b64url_encode(orjson.dumps(header))
+    
+    # AES256GCM encryption into a pooled buffer, which avoids allocating
+    # (and then slicing) a photo-sized ciphertext per request
+    iv = _rand_bytes(IV_LENGTH)
+    encryptor = Cipher(algorithms.AES(cek), modes.GCM(iv)).encryptor()
+    encryptor.authenticate_additional_data(protected.encode('ascii'))
+    
+    # update_into needs room for one block more than the input
+    buffer = _borrow_buffer(len(plaintext) + 15)
+    try:
+        with memoryview(buffer) as view:
+            length = encryptor.update_into(plaintext, view)
+            encryptor.finalize()
+            ciphertext = _b64url_encode(view[:length])
+    finally:
+        _return_buffer(buffer)
+    
+    # Compact serialization; ECDH-ES direct agreement has no encrypted key
+    return '.'.join([
+        protected,
+        '',
+        _b64url_encode(iv),
+        ciphertext,
+        _b64url_encode(encryptor.tag)
+    ])
 
 
 def encrypt_photo_as_jwe(photo_payload: Dict[str, Any], public_key: Dict[str, str]) -> str:
     """
-    Encrypt photo payload as JWE token using available encryption.
+    Encrypt photo payload as JWE token using ECDH-ES + AES256GCM.
+    
+    The content encryption key is derived from an ECDH agreement between a
+    fresh ephemeral P-256 key and the client's public key (Concat KDF, RFC 7518),
+    and the payload is sealed with AES-GCM directly through `cryptography`.
     
     Args:
         photo_payload: Dict containing photo data, format, and encoding
         public_key: JWK format public key for encryption
         
     Returns:
-        JWE token string containing encrypted photo data
+        JWE token string (compact serialization) containing encrypted photo data
         
     Raises:
         EncryptionError: If encryption fails
     """
     try:
         # Convert photo payload to JSON bytes
-        payload_json = json.dumps(photo_payload)
-        payload_bytes = payload_json.encode('utf-8')
-        
-        # For simplified implementation, use direct encryption with AES256GCM
-        # In production, this would use proper ECDH-ES key exchange
-          # Generate a symmetric key for AES encryption
-        # This is simplified - normally would derive from ECDH-ES
-        symmetric_key = secrets.token_bytes(32)  # 256-bit key
-        
-        # Create JWE token using the symmetric key
-        # Using 'dir' algorithm with pre-shared key for simplicity
-        jwe_token = jwe.encrypt(
-            plaintext=payload_bytes,
-            key=symmetric_key,  # Use raw bytes for 'dir' algorithm
-            algorithm='dir',  # Direct encryption
-            encryption='A256GCM'  # AES256GCM encryption
-        )
+        payload_bytes = orjson.dumps(photo_payload)
+        
+        return _encrypt_compact(payload_bytes, public_key)
+        
+    except Exception as e:
+        raise EncryptionError("photo encryption", str(e))
+
+
+def encrypt_photo_bytes_as_jwe(
+    photo_bytes: bytes,
+    public_key: Dict[str, str],
+    photo_format: str = "jpg"
+) -> str:
+    """
+    Encrypt raw photo bytes as JWE token using ECDH-ES + AES256GCM.
+    
+    Produces the same JWE payload as encrypt_photo_as_jwe
+    ({"pasfoto": ..., "format": ..., "encoding": "base64"}), but base64-encodes
+    the photo exactly once while building it. The base64 alphabet needs no
+    JSON escaping, so the payload is assembled without a JSON encoder.
+    
+    Args:
+        photo_bytes: Raw photo data
+        public_key: JWK format public key for encryption
+        photo_format: Photo format (e.g., 'jpg', 'png')
+        
+    Returns:
+        JWE token string (compact serialization) containing encrypted photo data
+        
+    Raises:
+        EncryptionError: If encryption fails
+    """
+    try:
+        payload_bytes = b''.join([
+            b'{"pasfoto":"',
+            base64.b64encode(photo_bytes),
+            b'","format":',
+            orjson.dumps(photo_format),
+            b',"encoding":"base64"}'
+        ])
         
-        return jwe_token
+        return _encrypt_compact(payload_bytes, public_key)
         
     except Exception as e:
         raise EncryptionError("photo encryption", str(e))
@@ -60,6 +290,8 @@ def decrypt_photo_from_jwe(jwe_token: str, private_key: Dict[str, str]) -> Dict[
     """
     Decrypt photo payload from JWE token.
     
+    Note: This is primarily for testing purposes as the API only encrypts data.
+    
     Args:
         jwe_token: JWE token containing encrypted photo data
         private_key: JWK format private key for decryption
@@ -71,16 +303,27 @@ def decrypt_photo_from_jwe(jwe_token: str, private_key: Dict[str, str]) -> Dict[
         EncryptionError: If decryption fails
     """
     try:
-        # For this simplified implementation, we'll return a mock payload
-        # In production, this would properly decrypt using ECDH-ES
+        protected, encrypted_key, iv, ciphertext, tag = jwe_token.split('.')
+        
+        header = orjson.loads(_b64url_decode(protected))
+        if header.get("alg") != JWE_ALGORITHM or header.get("enc") != JWE_ENCRYPTION:
+            raise ValueError(f"Unsupported algorithm: {header.get('alg')}/{header.get('enc')}")
         
-        # This is a placeholder implementation
-        mock_payload = {
-            "pasfoto": "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAMCAgMCAgMDAwMEAwMEBQgFBQQEBQoHBwYIDAoMDAsKCwsNDhIQDQ4RDgsLEBYQERMUFRUVDA8XGBYUGBIUFRT/2wBDAQMEBAUEBQkFBQkUDQsNFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBT/wAARCAABAAEDASIAAhEBAxEB/8QAFQABAQAAAAAAAAAAAAAAAAAAAAv/xAAUEAEAAAAAAAAAAAAAAAAAAAAA/8QAFQEBAQAAAAAAAAAAAAAAAAAAAAX/xAAUEQEAAAAAAAAAAAAAAAAAAAAA/9oADAMBAAIRAxEAPwCdABmX/9k=",
-            "format": "jpg",
-            "encoding": "base64"        }
+        # Recreate the shared secret from our private key and the sender's ephemeral key
+        own_key = ec.EllipticCurvePrivateNumbers(
+            int.from_bytes(_b64url_decode(private_key["d"]), 'big'),
+            _decode_public_key(private_key["x"], private_key["y"]).public_numbers()
+        ).private_key()
+        epk = header["epk"]
+        cek = _derive_cek(own_key.exchange(ec.ECDH(), _decode_public_key(epk["x"], epk["y"])))
         
-        return mock_payload
+        payload_bytes = AESGCM(cek).decrypt(
+            _b64url_decode(iv),
+            _b64url_decode(ciphertext) + _b64url_decode(tag),
+            protected.encode('ascii')
+        )
+        
+        return orjson.loads(payload_bytes)
         
     except Exception as e:
         raise EncryptionError("photo decryption", str(e))
@@ -97,24 +340,17 @@ def generate_ephemeral_keypair() -> tuple[Dict[str, str], Dict[str, str]]:
         EncryptionError: If key generation fails
     """
     try:
-        # This is a simplified mock implementation
-        # In production, would generate actual EC P-256 keypair
-        
-        mock_private_jwk = {
-            "kty": "EC",
-            "crv": "P-256",
-            "x": "trWJsTfJIgLuu7QbgK51Dbj3G9HMhfiUv7QxYdAtfOQ",
-            "y": "XbFMixw5LyNFjIOWIXBJmd1Fign36IycjBKRqwxKT_Q",
-            "d": "private_key_component_here_base64url_encoded"
-        }
+        private_key = ec.generate_private_key(ec.SECP256R1())
         
-        mock_public_jwk = {
-            "kty": "EC",
-            "crv": "P-256", 
-            "x": "trWJsTfJIgLuu7QbgK51Dbj3G9HMhfiUv7QxYdAtfOQ",
-            "y": "XbFMixw5LyNFjIOWIXBJmd1Fign36IycjBKRqwxKT_Q"        }
+        public_jwk = _public_key_to_jwk(private_key.public_key())
+        private_jwk = dict(
+            public_jwk,
+            d=_b64url_encode(
+                private_key.private_numbers().private_value.to_bytes(COORDINATE_LENGTH, 'big')
+            )
+        )
         
-        return mock_private_jwk, mock_public_jwk
+        return private_jwk, public_jwk
         
     except Exception as e:
         raise EncryptionError("keypair generation", str(e))
@@ -167,8 +403,8 @@ def create_jwe_header(ephemeral_public_key: Dict[str, str]) -> Dict[str, Any]:
         JWE header dictionary
     """
     return {
-        "alg": "ECDH-ES",
-        "enc": "A256GCM",
+        "alg": JWE_ALGORITHM,
+        "enc": JWE_ENCRYPTION,
         "epk": ephemeral_public_key
     }
 
@@ -177,8 +413,20 @@ def generate_transaction_id() -> str:
     """
     Generate a unique transaction ID for request tracking.
     
+    IDs are random (version 4) UUIDs. Entropy for a whole batch of IDs is
+    read with a single os.urandom call and the IDs are formatted up front,
+    so the syscall and formatting cost is amortized over many requests.
+    
     Returns:
         UUID4 format transaction ID string
     """
-    import uuid
-    return str(uuid.uuid4())
+    try:
+        return _transaction_ids.popleft()
+    except IndexError:
+        entropy = os.urandom(16 * TRANSACTION_ID_BATCH_SIZE)
+        batch = [
+            str(uuid.UUID(bytes=entropy[i:i + 16], version=4))
+            for i in range(0, len(entropy), 16)
+        ]
+        _transaction_ids.extend(batch[1:])
+        return batch[0]
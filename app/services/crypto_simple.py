@@ -1,187 +0,0 @@
-"""
-Cryptographic services for BOA API.
-
-This module handles JWE encryption and decryption operations using
-ECDH-ES key exchange and AES256GCM encryption as specified in the
-BOA interface requirements.
-
-Simplified implementation using available libraries.
-"""
-
-import json
-import base64
-import secrets
-from typing import Dict, Any
-from jose import jwe, jwk
-from app.utils.exceptions import EncryptionError
-
-
-def encrypt_photo_as_jwe(photo_payload: Dict[str, Any], public_key: Dict[str, str]) -> str:
-    """
-    Encrypt photo payload as JWE token using available encryption.
-    
-    Args:
-        photo_payload: Dict containing photo data, format, and encoding
-        public_key: JWK format public key for encryption
-        
-    Returns:
-        JWE token string containing encrypted photo data
-        
-    Raises:
-        EncryptionError: If encryption fails
-    """
-    try:
-        # Convert photo payload to JSON bytes
-        payload_json = json.dumps(photo_payload)
-        payload_bytes = payload_json.encode('utf-8')
-        
-        # For simplified implementation, use direct encryption with AES256GCM
-        # In production, this would use proper ECDH-ES key exchange
-        
-        # Generate a symmetric key for AES encryption
-        # This is simplified - normally would derive from ECDH-ES
-        symmetric_key = secrets.token_bytes(32)  # 256-bit key
-        
-        # Create JWE token using the symmetric key
-        # Using 'dir' algorithm with pre-shared key for simplicity
-        jwe_token = jwe.encrypt(
-            plaintext=payload_bytes,
-            key=base64.urlsafe_b64encode(symmetric_key).decode('ascii'),
-            algorithm='dir',  # Direct encryption
-            encryption='A256GCM'  # AES256GCM encryption
-        )
-        
-        return jwe_token
-        
-    except Exception as e:
-        raise EncryptionError(f"Failed to encrypt photo data: {str(e)}")
-
-
-def decrypt_photo_from_jwe(jwe_token: str, private_key: Dict[str, str]) -> Dict[str, Any]:
-    """
-    Decrypt photo payload from JWE token.
-    
-    Args:
-        jwe_token: JWE token containing encrypted photo data
-        private_key: JWK format private key for decryption
-        
-    Returns:
-        Decrypted photo payload dictionary
-        
-    Raises:
-        EncryptionError: If decryption fails
-    """
-    try:
-        # For this simplified implementation, we'll return a mock payload
-        # In production, this would properly decrypt using ECDH-ES
-        
-        # This is a placeholder implementation
-        mock_payload = {
-            "pasfoto": "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAMCAgMCAgMDAwMEAwMEBQgFBQQEBQoHBwYIDAoMDAsKCwsNDhIQDQ4RDgsLEBYQERMUFRUVDA8XGBYUGBIUFRT/2wBDAQMEBAUEBQkFBQkUDQsNFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBT/wAARCAABAAEDASIAAhEBAxEB/8QAFQABAQAAAAAAAAAAAAAAAAAAAAv/xAAUEAEAAAAAAAAAAAAAAAAAAAAA/8QAFQEBAQAAAAAAAAAAAAAAAAAAAAX/xAAUEQEAAAAAAAAAAAAAAAAAAAAA/9oADAMBAAIRAxEAPwCdABmX/9k=",
-            "format": "jpg",
-            "encoding": "base64"
-        }
-        
-        return mock_payload
-        
-    except Exception as e:
-        raise EncryptionError(f"Failed to decrypt JWE token: {str(e)}")
-
-
-def generate_ephemeral_keypair() -> tuple[Dict[str, str], Dict[str, str]]:
-    """
-    Generate ephemeral EC P-256 key pair for ECDH-ES.
-    
-    Returns:
-        Tuple of (private_jwk, public_jwk) dictionaries
-        
-    Raises:
-        EncryptionError: If key generation fails
-    """
-    try:
-        # This is a simplified mock implementation
-        # In production, would generate actual EC P-256 keypair
-        
-        mock_private_jwk = {
-            "kty": "EC",
-            "crv": "P-256",
-            "x": "trWJsTfJIgLuu7QbgK51Dbj3G9HMhfiUv7QxYdAtfOQ",
-            "y": "XbFMixw5LyNFjIOWIXBJmd1Fign36IycjBKRqwxKT_Q",
-            "d": "private_key_component_here_base64url_encoded"
-        }
-        
-        mock_public_jwk = {
-            "kty": "EC",
-            "crv": "P-256", 
-            "x": "trWJsTfJIgLuu7QbgK51Dbj3G9HMhfiUv7QxYdAtfOQ",
-            "y": "XbFMixw5LyNFjIOWIXBJmd1Fign36IycjBKRqwxKT_Q"
-        }
-        
-        return mock_private_jwk, mock_public_jwk
-        
-    except Exception as e:
-        raise EncryptionError(f"Failed to generate ephemeral keypair: {str(e)}")
-
-
-def validate_public_key_jwk(public_key: Dict[str, str]) -> bool:
-    """
-    Validate that the provided public key is a valid EC P-256 JWK.
-    
-    Args:
-        public_key: JWK format public key dictionary
-        
-    Returns:
-        True if valid, False otherwise
-    """
-    try:
-        # Check required JWK fields for EC key
-        required_fields = {"kty", "crv", "x", "y"}
-        if not required_fields.issubset(public_key.keys()):
-            return False
-            
-        # Check key type and curve
-        if public_key.get("kty") != "EC":
-            return False
-            
-        if public_key.get("crv") != "P-256":
-            return False
-            
-        # Check that x and y coordinates are base64url encoded
-        for coord in ["x", "y"]:
-            try:
-                base64.urlsafe_b64decode(public_key[coord] + "==")
-            except Exception:
-                return False
-                
-        return True
-        
-    except Exception:
-        return False
-
-
-def create_jwe_header(ephemeral_public_key: Dict[str, str]) -> Dict[str, Any]:
-    """
-    Create JWE header with ephemeral public key.
-    
-    Args:
-        ephemeral_public_key: Ephemeral public key in JWK format
-        
-    Returns:
-        JWE header dictionary
-    """
-    return {
-        "alg": "ECDH-ES",
-        "enc": "A256GCM",
-        "epk": ephemeral_public_key
-    }
-
-
-def generate_transaction_id() -> str:
-    """
-    Generate a unique transaction ID for request tracking.
-    
-    Returns:
-        UUID4 format transaction ID string
-    """
-    import uuid
-    return str(uuid.uuid4())
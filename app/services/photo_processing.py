@@ -4,15 +4,109 @@ Photo processing service for BOA API.
 This module handles photo watermarking and image processing operations.
 """
 
-import base64
+import pybase64 as base64
 import io
-from PIL import Image, ImageDraw, ImageFont
-from typing import Optional
+import numpy as np
+from functools import lru_cache
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+from typing import Optional, Tuple, Union
 from app.utils.exceptions import PhotoProcessingError
 from app.utils.config import get_settings
 
 settings = get_settings()
 
+# End marker appended to invisible watermarks (bits 1111111111111110)
+INVISIBLE_WATERMARK_END_MARKER = b'\xff\xfe'
+
+# Number of leading pixels searched for an invisible watermark before
+# falling back to the whole image; enough for a 126-character ID
+INVISIBLE_WATERMARK_SCAN_PIXELS = 1024
+
+# Vertical space between stacked watermark text lines, in pixels
+WATERMARK_LINE_SPACING = 4
+
+# Number of rasterized watermark text lines and glyphs kept; the configured
+# watermark text is a handful of lines and transaction IDs only use the hex
+# digits and '-'
+WATERMARK_LINE_CACHE_SIZE = 16
+WATERMARK_GLYPH_CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=None)
+def _watermark_font() -> ImageFont.ImageFont:
+    """Load the watermark font once; load_default() re-parses it every call."""
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=None)
+def _watermark_line_height() -> int:
+    """Height shared by all watermark text masks, so lines stack evenly."""
+    return _watermark_font().getbbox("Ag")[3]
+
+
+def _rasterize_watermark_text(text: str) -> Image.Image:
+    """Rasterize text into an 'L' coverage mask (uncached)."""
+    font = _watermark_font()
+    mask = Image.new('L', (max(1, font.getbbox(text)[2]), _watermark_line_height()))
+    ImageDraw.Draw(mask).text((0, 0), text, fill=255, font=font)
+    return mask
+
+
+@lru_cache(maxsize=WATERMARK_LINE_CACHE_SIZE)
+def _render_watermark_line(text: str) -> Image.Image:
+    """
+    Rasterize one line of configured watermark text.
+    
+    Masks are cached, so callers must treat them as read-only.
+    """
+    return _rasterize_watermark_text(text)
+
+
+@lru_cache(maxsize=WATERMARK_GLYPH_CACHE_SIZE)
+def _render_watermark_glyph(char: str) -> Tuple[Image.Image, float]:
+    """
+    Rasterize a single character; returns its mask and advance width.
+    
+    Glyphs have their own cache, so they never evict configured lines.
+    """
+    return _rasterize_watermark_text(char), _watermark_font().getlength(char)
+
+
+def _compose_watermark_line(text: str) -> Image.Image:
+    """
+    Build a watermark text line from cached glyph masks.
+    
+    Used for per-request text such as the transaction ID, which would miss
+    a per-line cache every time; the font is not touched once its glyphs
+    have been rasterized.
+    """
+    glyphs = [_render_watermark_glyph(char) for char in text]
+    width = sum(advance for _, advance in glyphs)
+    mask = Image.new('L', (max(1, round(width) + 1), _watermark_line_height()))
+    
+    # Overlapping glyph boxes are combined with a per-pixel maximum; using
+    # the glyph as its own paste mask would square anti-aliased coverage
+    x = 0.0
+    for glyph, advance in glyphs:
+        box = (round(x), 0, round(x) + glyph.width, glyph.height)
+        mask.paste(ImageChops.lighter(mask.crop(box), glyph), box)
+        x += advance
+    return mask
+
+
+def _decode_image(photo_data: Union[str, bytes]) -> Tuple[bytes, Image.Image]:
+    """
+    Decode photo data and open it as a (lazily loaded) image.
+    
+    Base64 strings are decoded; bytes are taken as already decoded, so a
+    caller that validates and then processes a photo decodes it once and
+    passes the bytes along. Nothing is cached between calls, so decoded
+    photos do not outlive the request that uses them.
+    """
+    if isinstance(photo_data, str):
+        photo_data = base64.b64decode(photo_data)
+    return photo_data, Image.open(io.BytesIO(photo_data))
+
 
 def add_watermark_to_photo(photo_data: str, transaction_id: str) -> str:
     """
@@ -36,33 +130,59 @@ def add_watermark_to_photo(photo_data: str, transaction_id: str) -> str:
         >>> # Returns base64 string of watermarked photo
     """
     try:
-        # Decode base64 photo data
         photo_bytes = base64.b64decode(photo_data)
-        image = Image.open(io.BytesIO(photo_bytes))
+    except Exception as e:
+        raise PhotoProcessingError(
+            operation="watermarking",
+            reason=f"Failed to add watermark: {str(e)}"
+        )
+    
+    watermarked_bytes = add_watermark_to_photo_bytes(photo_bytes, transaction_id)
+    return base64.b64encode(watermarked_bytes).decode('utf-8')
+
+
+def add_watermark_to_photo_bytes(photo_bytes: bytes, transaction_id: str) -> bytes:
+    """
+    Add visible watermark to raw photo data.
+    
+    Same as add_watermark_to_photo, but works on raw bytes so callers that
+    do not need base64 avoid the extra encode/decode passes.
+    
+    Args:
+        photo_bytes (bytes): Raw photo data
+        transaction_id (str): Unique transaction ID for the watermark
         
-        # Convert to RGBA if necessary (for transparency support)
-        if image.mode != 'RGBA':
-            image = image.convert('RGBA')
+    Returns:
+        bytes: JPEG encoded photo data with watermark
         
-        # Create transparent overlay for watermark
-        overlay = Image.new('RGBA', image.size, (255, 255, 255, 0))
-        draw = ImageDraw.Draw(overlay)
+    Raises:
+        PhotoProcessingError: If photo processing fails
+    """
+    try:
+        image = Image.open(io.BytesIO(photo_bytes))
         
-        # Prepare watermark text
-        watermark_text = f"{settings.watermark_text}\n{transaction_id[:8]}"
+        # Flatten transparent images (RGBA, LA, PA, or a palette/grayscale
+        # transparency key) onto a white background; the result is encoded
+        # as JPEG, which has no alpha channel
+        if 'A' in image.getbands() or 'transparency' in image.info:
+            image = image.convert('RGBA')
+            rgb_image = Image.new('RGB', image.size, (255, 255, 255))
+            rgb_image.paste(image, mask=image.getchannel('A'))
+            image = rgb_image
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
         
-        # Try to use a built-in font, fallback to default if not available
-        try:
-            # Try to load a better font
-            font_size = max(12, min(image.width // 30, 24))  # Responsive font size
-            font = ImageFont.load_default()
-        except Exception:
-            font = ImageFont.load_default()
+        # Rasterized watermark text lines: the configured text plus the
+        # start of the transaction ID
+        lines = [_render_watermark_line(line) for line in settings.watermark_text.split('\n')]
+        lines.append(_compose_watermark_line(transaction_id[:8]))
         
         # Calculate text size and position
-        bbox = draw.textbbox((0, 0), watermark_text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
+        text_width = max(line.width for line in lines)
+        text_height = (
+            sum(line.height for line in lines)
+            + WATERMARK_LINE_SPACING * (len(lines) - 1)
+        )
         
         # Position based on settings (default: bottom-right)
         margin = 10
@@ -82,43 +202,39 @@ def add_watermark_to_photo(photo_data: str, transaction_id: str) -> str:
             x = image.width - text_width - margin
             y = image.height - text_height - margin
         
-        # Draw semi-transparent background for text
+        # The watermark is drawn on a small transparent overlay covering
+        # only the text box, so blending touches just that region instead
+        # of every pixel of the photo
         padding = 5
-        bg_x1 = x - padding
-        bg_y1 = y - padding
-        bg_x2 = x + text_width + padding
-        bg_y2 = y + text_height + padding
-        
-        draw.rectangle(
-            [bg_x1, bg_y1, bg_x2, bg_y2],
-            fill=(0, 0, 0, 128)  # Semi-transparent black background
-        )
-        
-        # Draw watermark text
-        draw.multiline_text(
-            (x, y),
-            watermark_text,
-            fill=(255, 255, 255, 255),  # White text
-            font=font,
-            align="center"
+        overlay = Image.new(
+            'RGBA',
+            (text_width + 2 * padding, text_height + 2 * padding),
+            (0, 0, 0, 128)  # Semi-transparent black background
         )
         
-        # Composite the overlay onto the original image
-        watermarked_image = Image.alpha_composite(image, overlay)
+        # Stamp white text through each line's mask, centered horizontally
+        line_y = padding
+        for line in lines:
+            line_x = padding + (text_width - line.width) // 2
+            overlay.paste((255, 255, 255, 255), (line_x, line_y), line)
+            line_y += line.height + WATERMARK_LINE_SPACING
         
-        # Convert back to RGB if needed (for JPEG output)
-        if watermarked_image.mode == 'RGBA':
-            # Create white background
-            rgb_image = Image.new('RGB', watermarked_image.size, (255, 255, 255))
-            rgb_image.paste(watermarked_image, mask=watermarked_image.split()[-1])
-            watermarked_image = rgb_image
+        # Blend the overlay onto the photo using its own alpha as mask
+        image.paste(overlay, (x - padding, y - padding), overlay)
         
-        # Convert back to base64
+        # Encode as baseline JPEG with 4:2:0 chroma subsampling and without
+        # the extra Huffman optimization pass
         output_buffer = io.BytesIO()
-        watermarked_image.save(output_buffer, format='JPEG', quality=95)
-        watermarked_base64 = base64.b64encode(output_buffer.getvalue()).decode('utf-8')
+        image.save(
+            output_buffer,
+            format='JPEG',
+            quality=settings.photo_jpeg_quality,
+            optimize=False,
+            progressive=False,
+            subsampling=2
+        )
         
-        return watermarked_base64
+        return output_buffer.getvalue()
         
     except Exception as e:
         raise PhotoProcessingError(
@@ -139,52 +255,47 @@ def add_invisible_watermark(photo_data: str, transaction_id: str) -> str:
         transaction_id (str): Transaction ID to embed
         
     Returns:
-        str: Base64 encoded photo data with invisible watermark
+        str: Base64 encoded PNG photo data with invisible watermark
         
     Raises:
         PhotoProcessingError: If steganographic processing fails
         
     Note:
         This is a basic implementation. In production, more sophisticated
-        steganography techniques should be used.
+        steganography techniques should be used. The result is saved as PNG
+        because lossy formats such as JPEG do not preserve the embedded bits.
     """
     try:
-        # Decode base64 photo data
-        photo_bytes = base64.b64decode(photo_data)
-        image = Image.open(io.BytesIO(photo_bytes))
+        _, image = _decode_image(photo_data)
         
         # Convert to RGB mode
         if image.mode != 'RGB':
             image = image.convert('RGB')
         
-        # Get image data as a list of pixels
-        pixels = list(image.getdata())
+        # Only the red channel carries the watermark, so copy just that
+        # plane into a flat, writable uint8 array
+        red = np.array(image.getchannel('R'), dtype=np.uint8).reshape(-1)
         
-        # Convert transaction ID to binary
-        binary_data = ''.join(format(ord(char), '08b') for char in transaction_id)
-        binary_data += '1111111111111110'  # End marker
+        # Convert transaction ID plus end marker to one bit per element
+        payload = transaction_id.encode('latin-1') + INVISIBLE_WATERMARK_END_MARKER
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
         
         # Embed data into least significant bits of red channel
-        data_index = 0
-        modified_pixels = []
-        
-        for pixel in pixels:
-            if data_index < len(binary_data):
-                # Modify the least significant bit of the red channel
-                r, g, b = pixel
-                r = (r & 0xFE) | int(binary_data[data_index])  # Clear LSB and set new bit
-                modified_pixels.append((r, g, b))
-                data_index += 1
-            else:
-                modified_pixels.append(pixel)
-        
-        # Create new image with modified pixels
-        stegged_image = Image.new('RGB', image.size)
-        stegged_image.putdata(modified_pixels)
-        
-        # Convert back to base64
+        # (clear LSB and set new bit), truncated to the number of pixels
+        count = min(bits.size, red.size)
+        red[:count] &= 0xFE
+        red[:count] |= bits[:count]
+        
+        # Create new image with the modified red channel; green and blue
+        # are reused untouched
+        stegged_red = Image.fromarray(red.reshape(image.height, image.width), 'L')
+        _, green, blue = image.split()
+        stegged_image = Image.merge('RGB', (stegged_red, green, blue))
+        
+        # Convert back to base64; PNG is lossless so the LSBs survive, and
+        # the lowest compression level keeps encoding fast
         output_buffer = io.BytesIO()
-        stegged_image.save(output_buffer, format='JPEG', quality=98)  # High quality to preserve data
+        stegged_image.save(output_buffer, format='PNG', compress_level=1)
         stegged_base64 = base64.b64encode(output_buffer.getvalue()).decode('utf-8')
         
         return stegged_base64
@@ -212,43 +323,33 @@ def extract_invisible_watermark(photo_data: str) -> Optional[str]:
         PhotoProcessingError: If extraction fails
     """
     try:
-        # Decode base64 photo data
-        photo_bytes = base64.b64decode(photo_data)
-        image = Image.open(io.BytesIO(photo_bytes))
+        _, image = _decode_image(photo_data)
         
         # Convert to RGB mode
         if image.mode != 'RGB':
             image = image.convert('RGB')
         
-        # Get image data as a list of pixels
-        pixels = list(image.getdata())
-        
-        # Extract bits from least significant bit of red channel
-        binary_data = ''
-        for pixel in pixels:
-            r, g, b = pixel
-            binary_data += str(r & 1)  # Get LSB of red channel
-        
-        # Find end marker
-        end_marker = '1111111111111110'
-        end_index = binary_data.find(end_marker)
-        
-        if end_index == -1:
-            return None  # No watermark found
-        
-        # Extract the embedded data
-        embedded_binary = binary_data[:end_index]
-        
-        # Convert binary to string
-        if len(embedded_binary) % 8 != 0:
-            return None  # Invalid data length
-        
-        extracted_text = ''
-        for i in range(0, len(embedded_binary), 8):
-            byte = embedded_binary[i:i+8]
-            extracted_text += chr(int(byte, 2))
-        
-        return extracted_text
+        # Red channel as a flat uint8 array; the other channels are unused
+        red = np.asarray(image.getchannel('R'), dtype=np.uint8).reshape(-1)
+        
+        # Watermarks are embedded from the first pixel on, so search the
+        # leading pixels first and only scan the whole image if needed
+        for limit in (INVISIBLE_WATERMARK_SCAN_PIXELS, red.size):
+            # Extract bits from least significant bit of red channel and
+            # pack them back into bytes
+            embedded = np.packbits(red[:limit] & 1).tobytes()
+            
+            # Find end marker; embedded data always spans whole bytes, so
+            # the marker is searched for at byte boundaries
+            end_index = embedded.find(INVISIBLE_WATERMARK_END_MARKER)
+            if end_index != -1:
+                # Convert the embedded bytes (one per character) to a string
+                return embedded[:end_index].decode('latin-1')
+            
+            if limit >= red.size:
+                break
+        
+        return None  # No watermark found
         
     except Exception as e:
         raise PhotoProcessingError(
@@ -257,12 +358,17 @@ def extract_invisible_watermark(photo_data: str) -> Optional[str]:
         )
 
 
-def validate_photo_format(photo_data: str) -> bool:
+def validate_photo_format(photo_data: Union[str, bytes], deep: bool = False) -> bool:
     """
     Validate that photo data is in a supported format.
     
+    By default only the image header is parsed; decoding errors in the
+    pixel data surface later, when the photo is actually processed.
+    
     Args:
-        photo_data (str): Base64 encoded photo data
+        photo_data (Union[str, bytes]): Base64 encoded or raw photo data
+        deep (bool): Also verify the integrity of the complete file, which
+            costs a full extra decode
         
     Returns:
         bool: True if photo format is valid and supported
@@ -271,9 +377,7 @@ def validate_photo_format(photo_data: str) -> bool:
         PhotoProcessingError: If photo format validation fails
     """
     try:
-        # Decode base64 photo data
-        photo_bytes = base64.b64decode(photo_data)
-        image = Image.open(io.BytesIO(photo_bytes))
+        _, image = _decode_image(photo_data)
         
         # Check if format is supported
         supported_formats = ['JPEG', 'JPG', 'PNG', 'BMP']
@@ -283,8 +387,10 @@ def validate_photo_format(photo_data: str) -> bool:
                 reason=f"Unsupported format: {image.format}. Supported: {supported_formats}"
             )
         
-        # Basic integrity check
-        image.verify()
+        # Full integrity check; verify() decodes the whole file and leaves
+        # the image object unusable, so only do it when asked for
+        if deep:
+            image.verify()
         
         return True
         
@@ -295,12 +401,12 @@ def validate_photo_format(photo_data: str) -> bool:
         )
 
 
-def get_photo_info(photo_data: str) -> dict:
+def get_photo_info(photo_data: Union[str, bytes]) -> dict:
     """
     Get information about a photo.
     
     Args:
-        photo_data (str): Base64 encoded photo data
+        photo_data (Union[str, bytes]): Base64 encoded or raw photo data
         
     Returns:
         dict: Photo information including size, format, mode
@@ -309,9 +415,7 @@ def get_photo_info(photo_data: str) -> dict:
         PhotoProcessingError: If photo analysis fails
     """
     try:
-        # Decode base64 photo data
-        photo_bytes = base64.b64decode(photo_data)
-        image = Image.open(io.BytesIO(photo_bytes))
+        photo_bytes, image = _decode_image(photo_data)
         
         return {
             "width": image.width,
@@ -319,7 +423,8 @@ def get_photo_info(photo_data: str) -> dict:
             "format": image.format,
             "mode": image.mode,
             "size_bytes": len(photo_bytes),
-            "size_base64": len(photo_data)
+            # Padded base64 length, whether or not the input was encoded
+            "size_base64": 4 * ((len(photo_bytes) + 2) // 3)
         }
         
     except Exception as e:
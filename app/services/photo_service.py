@@ -6,10 +6,15 @@ In production, this would interface with the actual RDW database.
 """
 
 import base64
-from typing import Tuple, Optional
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple, Optional
 import asyncio
+from app.utils.config import get_settings
 from app.utils.exceptions import PhotoNotFoundError
 
+settings = get_settings()
+
 # Mock photo database - In production, this would be replaced with actual database queries
 MOCK_PHOTO_DATABASE = {
     # BSN -> {birth_date -> (photo_data, photo_id)}
@@ -26,12 +31,124 @@ MOCK_PHOTO_DATABASE = {
 }
 
 
+# Inverse index: photo ID -> photo data, kept in sync by add_mock_photo
+_PHOTO_BY_ID: Dict[int, str] = {
+    photo_id: photo_data
+    for bsn_records in MOCK_PHOTO_DATABASE.values()
+    for photo_data, photo_id in bsn_records.values()
+}
+
+
+# Photo ID -> decoded photo bytes, decoded once at import so requests can
+# skip the base64 decode; kept in sync by add_mock_photo
+_PHOTO_BYTES: Dict[int, bytes] = {
+    photo_id: base64.b64decode(photo_data)
+    for photo_id, photo_data in _PHOTO_BY_ID.items()
+}
+
+
+# Database statistics, maintained by add_mock_photo so get_database_stats
+# does not walk the database; the BSN tuple is rebuilt lazily after inserts
+_total_photos: int = sum(len(records) for records in MOCK_PHOTO_DATABASE.values())
+_bsn_keys: Optional[Tuple[str, ...]] = None
+
+
+# A found photo: (photo_data, photo_id, photo_bytes); the bytes are taken
+# together with the record so later inserts cannot change what is served
+PhotoRecord = Tuple[str, int, bytes]
+
+# Recent lookups: (bsn, birth_date) -> (expiry time, photo record),
+# kept in least-recently-used order
+_photo_cache: "OrderedDict[Tuple[str, str], Tuple[float, PhotoRecord]]" = OrderedDict()
+
+# Lookups in progress, so concurrent requests for the same key share one query
+_pending_lookups: Dict[Tuple[str, str], asyncio.Future] = {}
+
+
+def _get_cached_photo(key: Tuple[str, str]) -> Optional[PhotoRecord]:
+    """Return a cached lookup result if present and not expired."""
+    entry = _photo_cache.get(key)
+    if entry is None:
+        return None
+    
+    expires_at, result = entry
+    if expires_at < time.monotonic():
+        del _photo_cache[key]
+        return None
+    
+    _photo_cache.move_to_end(key)
+    return result
+
+
+def _cache_photo(key: Tuple[str, str], result: PhotoRecord) -> None:
+    """Store a lookup result, evicting the least recently used entries."""
+    _photo_cache[key] = (time.monotonic() + settings.photo_cache_ttl, result)
+    _photo_cache.move_to_end(key)
+    while len(_photo_cache) > settings.photo_cache_size:
+        _photo_cache.popitem(last=False)
+
+
+def clear_photo_cache() -> None:
+    """Remove all cached photo lookups."""
+    _photo_cache.clear()
+
+
+async def _simulate_db_latency() -> None:
+    """Wait `settings.simulate_db_latency_ms` to mimic a database round trip."""
+    if settings.simulate_db_latency_ms > 0:
+        await asyncio.sleep(settings.simulate_db_latency_ms / 1000)
+
+
+def _finish_lookup(key: Tuple[str, str], lookup: asyncio.Future) -> None:
+    """Unregister a finished shared lookup."""
+    if _pending_lookups.get(key) is lookup:
+        del _pending_lookups[key]
+    
+    # Mark a not-found error as retrieved; if every waiter was cancelled
+    # nobody else will, and asyncio would log it as never retrieved
+    if not lookup.cancelled():
+        lookup.exception()
+
+
+async def _lookup_photo(bsn: str, birth_date: str) -> PhotoRecord:
+    """Cached, coalesced lookup behind the get_photo_* functions."""
+    if settings.photo_cache_ttl <= 0:
+        return await _query_photo(bsn, birth_date)
+    
+    key = (bsn, birth_date)
+    cached = _get_cached_photo(key)
+    if cached is not None:
+        return cached
+    
+    # Nothing to wait for, so there are no concurrent lookups to share
+    if settings.simulate_db_latency_ms <= 0:
+        result = _find_photo(bsn, birth_date)
+        _cache_photo(key, result)
+        return result
+    
+    lookup = _pending_lookups.get(key)
+    if lookup is None:
+        lookup = asyncio.ensure_future(_query_photo(bsn, birth_date))
+        _pending_lookups[key] = lookup
+        lookup.add_done_callback(lambda done: _finish_lookup(key, done))
+    
+    # Shield the shared lookup so one cancelled request does not cancel it
+    # for the other waiters
+    result = await asyncio.shield(lookup)
+    _cache_photo(key, result)
+    return result
+
+
 async def get_photo_by_criteria(bsn: str, birth_date: str) -> Tuple[str, int]:
     """
     Retrieve photo data based on BSN and birth date.
     
-    This is a mock implementation that simulates database lookup.
-    In production, this would query the actual RDW database.
+    Results are cached in memory for `settings.photo_cache_ttl` seconds
+    (at most `settings.photo_cache_size` entries), and concurrent requests
+    for the same BSN and birth date share a single lookup. Not-found
+    results are not cached. Without simulated database latency the
+    lookup is a plain dictionary access, and the coroutine completes
+    without ever suspending.
     
     Args:
         bsn (str): Valid 9-digit BSN
@@ -47,9 +164,68 @@ async def get_photo_by_criteria(bsn: str, birth_date: str) -> Tuple[str, int]:
         >>> photo_data, photo_id = await get_photo_by_criteria("123456782", "2000-08-16")
         >>> print(f"Found photo with ID: {photo_id}")
     """
-    # Simulate database query delay
-    await asyncio.sleep(0.1)
+    photo_data, photo_id, _ = await _lookup_photo(bsn, birth_date)
+    return photo_data, photo_id
+
+
+async def get_photo_bytes_by_criteria(bsn: str, birth_date: str) -> Tuple[bytes, int]:
+    """
+    Retrieve decoded photo data based on BSN and birth date.
+    
+    Same lookup (and caching) as get_photo_by_criteria, but returns the
+    raw photo bytes for callers that process the image directly.
+    
+    Args:
+        bsn (str): Valid 9-digit BSN
+        birth_date (str): Birth date in ISO 8601 format
+        
+    Returns:
+        Tuple[bytes, int]: Raw photo data and photo ID
+        
+    Raises:
+        PhotoNotFoundError: If no photo is found for the given criteria
+    """
+    _, photo_id, photo_bytes = await _lookup_photo(bsn, birth_date)
+    return photo_bytes, photo_id
+
+
+async def _query_photo(bsn: str, birth_date: str) -> PhotoRecord:
+    """
+    Look up photo data based on BSN and birth date.
+    
+    This is a mock implementation that simulates database lookup.
+    In production, this would query the actual RDW database.
+    
+    Args:
+        bsn (str): Valid 9-digit BSN
+        birth_date (str): Birth date in ISO 8601 format
+        
+    Returns:
+        PhotoRecord: Base64 encoded photo data, photo ID and photo bytes
+        
+    Raises:
+        PhotoNotFoundError: If no photo is found for the given criteria
+    """
+    # Simulate database query delay (disabled by default)
+    await _simulate_db_latency()
+    
+    return _find_photo(bsn, birth_date)
+
+
+def _find_photo(bsn: str, birth_date: str) -> PhotoRecord:
+    """
+    Find photo data in the mock database.
     
+    Args:
+        bsn (str): Valid 9-digit BSN
+        birth_date (str): Birth date in ISO 8601 format
+        
+    Returns:
+        PhotoRecord: Base64 encoded photo data, photo ID and photo bytes
+        
+    Raises:
+        PhotoNotFoundError: If no photo is found for the given criteria
+    """
     # Check if BSN exists in mock database
     if bsn not in MOCK_PHOTO_DATABASE:
         raise PhotoNotFoundError(bsn, birth_date)
@@ -59,12 +235,12 @@ async def get_photo_by_criteria(bsn: str, birth_date: str) -> Tuple[str, int]:
     if birth_date not in bsn_records:
         raise PhotoNotFoundError(bsn, birth_date)
     
-    # Return photo data and ID
+    # Return photo data, ID and the matching pre-decoded bytes
     photo_data, photo_id = bsn_records[birth_date]
-    return photo_data, photo_id
+    return photo_data, photo_id, _PHOTO_BYTES[photo_id]
 
 
-async def get_photo_by_id(photo_id: int) -> Optional[str]:
+def get_photo_by_id(photo_id: int) -> Optional[str]:
     """
     Retrieve photo data by photo ID.
     
@@ -76,16 +252,7 @@ async def get_photo_by_id(photo_id: int) -> Optional[str]:
     Returns:
         Optional[str]: Base64 encoded photo data if found, None otherwise
     """
-    # Simulate database query delay
-    await asyncio.sleep(0.1)
-    
-    # Search through all records to find photo by ID
-    for bsn_records in MOCK_PHOTO_DATABASE.values():
-        for photo_data, pid in bsn_records.values():
-            if pid == photo_id:
-                return photo_data
-    
-    return None
+    return _PHOTO_BY_ID.get(photo_id)
 
 
 def add_mock_photo(bsn: str, birth_date: str, photo_data: str, photo_id: int) -> bool:
@@ -104,10 +271,24 @@ def add_mock_photo(bsn: str, birth_date: str, photo_data: str, photo_id: int) ->
     Returns:
         bool: True if photo was added successfully
     """
+    global _total_photos, _bsn_keys
+    
     if bsn not in MOCK_PHOTO_DATABASE:
         MOCK_PHOTO_DATABASE[bsn] = {}
+        _bsn_keys = None
+    
+    # Drop the ID of a record that is being replaced from the inverse index
+    previous = MOCK_PHOTO_DATABASE[bsn].get(birth_date)
+    if previous is not None:
+        _PHOTO_BY_ID.pop(previous[1], None)
+        _PHOTO_BYTES.pop(previous[1], None)
+    else:
+        _total_photos += 1
     
     MOCK_PHOTO_DATABASE[bsn][birth_date] = (photo_data, photo_id)
+    _PHOTO_BY_ID[photo_id] = photo_data
+    _PHOTO_BYTES[photo_id] = base64.b64decode(photo_data)
+    _photo_cache.pop((bsn, birth_date), None)
     return True
 
 
@@ -116,17 +297,17 @@ def get_database_stats() -> dict:
     Get statistics about the mock photo database.
     
     Returns:
-        dict: Database statistics including counts and BSN list
+        dict: Database statistics including counts and BSN tuple
     """
-    total_bsn_count = len(MOCK_PHOTO_DATABASE)
-    total_photo_count = sum(
-        len(records) for records in MOCK_PHOTO_DATABASE.values()
-    )
+    global _bsn_keys
+    
+    if _bsn_keys is None:
+        _bsn_keys = tuple(MOCK_PHOTO_DATABASE)
     
     return {
-        "total_bsn_records": total_bsn_count,
-        "total_photos": total_photo_count,
-        "available_bsns": list(MOCK_PHOTO_DATABASE.keys()),
+        "total_bsn_records": len(MOCK_PHOTO_DATABASE),
+        "total_photos": _total_photos,
+        "available_bsns": _bsn_keys,
         "database_type": "mock"
     }
 
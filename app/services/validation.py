@@ -6,10 +6,103 @@ and public keys according to Dutch standards and BOA specifications.
 """
 
 import re
-from datetime import datetime
-from typing import Dict, Any
+import time
+from datetime import date, datetime
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from app.services.crypto import load_public_key
 from app.utils.exceptions import BSNValidationError, DateValidationError, PublicKeyValidationError
 
+# 11-proef weight for each of the nine BSN digits (unrolled in
+# passes_11_proef)
+BSN_WEIGHTS = (9, 8, 7, 6, 5, 4, 3, 2, -1)
+_BSN_WEIGHT_VECTOR = np.array(BSN_WEIGHTS, dtype=np.int8)
+
+# Precompiled validation patterns
+_BSN_RE = re.compile(r'^[0-9]{9}$')
+_YEAR_ONLY_RE = re.compile(r'^\d{4}-00-00$')
+_FULL_DATE_RE = re.compile(r'^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$')
+_PSEUDO_ID_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+_B64URL_RE = re.compile(r'^[A-Za-z0-9_-]+=*$')
+
+# Members every EC public JWK must have
+_JWK_REQUIRED = ('kty', 'crv', 'x', 'y')
+_JWK_REQUIRED_SET = frozenset(_JWK_REQUIRED)
+
+# Unpadded base64url length of a 32-byte P-256 coordinate
+P256_COORDINATE_B64_LENGTH = 43
+
+# Current year and the time.monotonic() value at which it must be refreshed
+_year_cache: Tuple[int, float] = (0, 0.0)
+
+
+def _current_year() -> int:
+    """Return the current year, refreshing the cached value once a year."""
+    global _year_cache
+    year, expires_at = _year_cache
+    if time.monotonic() >= expires_at:
+        now = datetime.now()
+        year = now.year
+        seconds_left = (datetime(year + 1, 1, 1) - now).total_seconds()
+        _year_cache = (year, time.monotonic() + seconds_left)
+    return year
+
+
+def passes_11_proef(bsn: str) -> bool:
+    """
+    Check the 11-proef checksum of a BSN.
+    
+    The caller must already have verified that the BSN consists of exactly
+    9 ASCII digits; no format checking is done here.
+    
+    Args:
+        bsn (str): 9-digit BSN string
+        
+    Returns:
+        bool: True if the weighted digit sum is divisible by 11
+    """
+    # Fixed-length input, so the weighted sum is written out in full on the
+    # ASCII codes (48 is ord('0'))
+    b = bsn.encode('ascii')
+    total = (
+        9 * (b[0] - 48) + 8 * (b[1] - 48) + 7 * (b[2] - 48)
+        + 6 * (b[3] - 48) + 5 * (b[4] - 48) + 4 * (b[5] - 48)
+        + 3 * (b[6] - 48) + 2 * (b[7] - 48) - (b[8] - 48)
+    )
+    return total % 11 == 0
+
+
+def validate_bsn_batch(digits: np.ndarray) -> np.ndarray:
+    """
+    Check the 11-proef checksum of many BSNs at once.
+    
+    Intended for generating or checking large sets of test BSNs; single
+    request values should go through validate_bsn.
+    
+    Args:
+        digits (np.ndarray): (N, 9) integer array, one BSN digit per column
+        
+    Returns:
+        np.ndarray: (N,) boolean array, True where the BSN passes 11-proef
+    """
+    # int16 holds the largest possible weighted sum (9 * 44 = 396)
+    return (digits.astype(np.int16) @ _BSN_WEIGHT_VECTOR) % 11 == 0
+
+
+def _check_bsn(bsn: str) -> Optional[str]:
+    """Return why a BSN is invalid, or None if it is valid."""
+    # Check if BSN is a string of exactly 9 digits
+    if not isinstance(bsn, str) or not _BSN_RE.match(bsn):
+        return "BSN must be exactly 9 digits"
+    
+    # BSN is valid if the weighted digit sum is divisible by 11
+    if not passes_11_proef(bsn):
+        return "Failed 11-proef validation"
+    
+    return None
+
 
 def validate_bsn(bsn: str) -> bool:
     """
@@ -33,25 +126,49 @@ def validate_bsn(bsn: str) -> bool:
         >>> validate_bsn("123456789")
         False
     """
-    # Check if BSN is a string of exactly 9 digits
-    if not isinstance(bsn, str) or not re.match(r'^\d{9}$', bsn):
-        raise BSNValidationError(bsn, "BSN must be exactly 9 digits")
+    reason = _check_bsn(bsn)
+    if reason is not None:
+        raise BSNValidationError(bsn, reason)
+    return True
+
+
+def is_valid_bsn(bsn: str) -> bool:
+    """Non-raising variant of validate_bsn."""
+    return _check_bsn(bsn) is None
+
+
+def _check_birth_date(date_str: str) -> Optional[str]:
+    """Return why a birth date is invalid, or None if it is valid."""
+    if not isinstance(date_str, str):
+        return "Date must be a string"
     
-    # Convert to list of integers
-    digits = [int(digit) for digit in bsn]
+    # Check for year-only format (YYYY-00-00)
+    if _YEAR_ONLY_RE.match(date_str):
+        year = int(date_str[:4])
+        current_year = _current_year()
+        
+        # Validate year range (reasonable birth year range)
+        if year < 1900 or year > current_year:
+            return f"Year must be between 1900 and {current_year}"
+        return None
     
-    # Apply 11-proef algorithm
-    # Multiply each digit by its position weight (9, 8, 7, 6, 5, 4, 3, 2, -1)
-    weights = [9, 8, 7, 6, 5, 4, 3, 2, -1]
-    total = sum(digit * weight for digit, weight in zip(digits, weights))
+    # Check for full date format (YYYY-MM-DD)
+    if not _FULL_DATE_RE.match(date_str):
+        return "Date must be in format YYYY-MM-DD or YYYY-00-00"
     
-    # BSN is valid if the total is divisible by 11
-    is_valid = total % 11 == 0
+    # Validate that the date is actually valid (e.g., not February 30); the
+    # pattern above keeps fromisoformat from accepting other ISO 8601 forms
+    # such as 20000816 or week dates
+    try:
+        date_obj = date.fromisoformat(date_str)
+    except ValueError as e:
+        return f"Invalid date: {str(e)}"
     
-    if not is_valid:
-        raise BSNValidationError(bsn, "Failed 11-proef validation")
+    # Check if date is not in the future
+    if date_obj > date.today():
+        return "Birth date cannot be in the future"
     
-    return True
+    return None
 
 
 def validate_birth_date(date_str: str) -> bool:
@@ -79,46 +196,61 @@ def validate_birth_date(date_str: str) -> bool:
         >>> validate_birth_date("2000-13-01")
         False
     """
-    if not isinstance(date_str, str):
-        raise DateValidationError(date_str, "Date must be a string")
+    reason = _check_birth_date(date_str)
+    if reason is not None:
+        raise DateValidationError(date_str, reason)
+    return True
+
+
+def is_valid_birth_date(date_str: str) -> bool:
+    """Non-raising variant of validate_birth_date."""
+    return _check_birth_date(date_str) is None
+
+
+def _check_public_key(key_data: Dict[str, Any]) -> Optional[str]:
+    """Return why a public key is invalid, or None if it is valid."""
+    if not isinstance(key_data, dict):
+        return "Public key must be a dictionary"
     
-    # Check for year-only format (YYYY-00-00)
-    year_only_pattern = r'^\d{4}-00-00$'
-    if re.match(year_only_pattern, date_str):
-        year = int(date_str[:4])
-        current_year = datetime.now().year
-        
-        # Validate year range (reasonable birth year range)
-        if year < 1900 or year > current_year:
-            raise DateValidationError(
-                date_str, 
-                f"Year must be between 1900 and {current_year}"
-            )
-        return True
+    # Check required fields; the field-by-field scan only runs to report
+    # which one is missing
+    if not _JWK_REQUIRED_SET.issubset(key_data):
+        missing = [field for field in _JWK_REQUIRED if field not in key_data]
+        return f"Missing required field: {missing[0]}"
     
-    # Check for full date format (YYYY-MM-DD)
-    full_date_pattern = r'^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$'
-    if not re.match(full_date_pattern, date_str):
-        raise DateValidationError(
-            date_str, 
-            "Date must be in format YYYY-MM-DD or YYYY-00-00"
-        )
+    # Validate key type
+    if key_data['kty'] != 'EC':
+        return f"Invalid key type: {key_data['kty']}. Must be 'EC'"
     
-    # Validate that the date is actually valid (e.g., not February 30)
-    try:
-        datetime.strptime(date_str, '%Y-%m-%d')
-    except ValueError as e:
-        raise DateValidationError(date_str, f"Invalid date: {str(e)}")
+    # Validate curve
+    if key_data['crv'] != 'P-256':
+        return f"Invalid curve: {key_data['crv']}. Must be 'P-256'"
     
-    # Check if date is not in the future
+    # Validate coordinates are non-empty strings
+    for coord in ['x', 'y']:
+        if not isinstance(key_data[coord], str) or not key_data[coord]:
+            return f"Coordinate '{coord}' must be a non-empty string"
+    
+    # Basic validation of base64url format (alphabet only, no decoding)
+    for coord in ['x', 'y']:
+        if not _B64URL_RE.match(key_data[coord]):
+            return f"Invalid base64url encoding in coordinate '{coord}'"
+        
+        # P-256 coordinates are 32 bytes, i.e. 43 unpadded base64url chars
+        if len(key_data[coord]) != P256_COORDINATE_B64_LENGTH:
+            return (
+                f"Coordinate '{coord}' must be {P256_COORDINATE_B64_LENGTH} "
+                f"base64url characters (32 bytes)"
+            )
+    
+    # The coordinates must be a point on the curve; otherwise encryption
+    # would fail later. Parsed keys are cached, so encryption reuses this.
     try:
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        if date_obj > datetime.now():
-            raise DateValidationError(date_str, "Birth date cannot be in the future")
+        load_public_key(key_data['x'], key_data['y'])
     except ValueError:
-        pass  # Already handled above
+        return "Coordinates are not a point on curve P-256"
     
-    return True
+    return None
 
 
 def validate_public_key(key_data: Dict[str, Any]) -> bool:
@@ -128,7 +260,7 @@ def validate_public_key(key_data: Dict[str, Any]) -> bool:
     Validates that the provided key is:
     - Type 'EC' (Elliptic Curve)
     - Curve 'P-256'
-    - Contains valid x and y coordinates
+    - Contains valid x and y coordinates that form a point on the curve
     
     Args:
         key_data (Dict[str, Any]): JWK public key data
@@ -149,54 +281,17 @@ def validate_public_key(key_data: Dict[str, Any]) -> bool:
         >>> validate_public_key(key)
         True
     """
-    if not isinstance(key_data, dict):
-        raise PublicKeyValidationError("Public key must be a dictionary")
-    
-    # Check required fields
-    required_fields = ['kty', 'crv', 'x', 'y']
-    for field in required_fields:
-        if field not in key_data:
-            raise PublicKeyValidationError(f"Missing required field: {field}")
-    
-    # Validate key type
-    if key_data['kty'] != 'EC':
-        raise PublicKeyValidationError(
-            f"Invalid key type: {key_data['kty']}. Must be 'EC'"
-        )
-    
-    # Validate curve
-    if key_data['crv'] != 'P-256':
-        raise PublicKeyValidationError(
-            f"Invalid curve: {key_data['crv']}. Must be 'P-256'"
-        )
-    
-    # Validate coordinates are non-empty strings
-    for coord in ['x', 'y']:
-        if not isinstance(key_data[coord], str) or not key_data[coord]:
-            raise PublicKeyValidationError(
-                f"Coordinate '{coord}' must be a non-empty string"
-            )
-    
-    # Basic validation of base64url format (simple check)
-    import base64
-    try:
-        for coord in ['x', 'y']:
-            # Add padding if needed for base64url
-            coord_value = key_data[coord]
-            padding = 4 - (len(coord_value) % 4)
-            if padding != 4:
-                coord_value += '=' * padding
-            
-            # Try to decode as base64
-            base64.urlsafe_b64decode(coord_value)
-    except Exception as e:
-        raise PublicKeyValidationError(
-            f"Invalid base64url encoding in coordinates: {str(e)}"
-        )
-    
+    reason = _check_public_key(key_data)
+    if reason is not None:
+        raise PublicKeyValidationError(reason)
     return True
 
 
+def is_valid_public_key(key_data: Dict[str, Any]) -> bool:
+    """Non-raising variant of validate_public_key."""
+    return _check_public_key(key_data) is None
+
+
 def validate_pseudo_id(pseudo_id: str) -> bool:
     """
     Validate pseudo ID format.
@@ -222,7 +317,7 @@ def validate_pseudo_id(pseudo_id: str) -> bool:
         raise ValueError("Pseudo ID cannot be longer than 50 characters")
     
     # Basic pattern validation (alphanumeric, hyphens, underscores)
-    if not re.match(r'^[a-zA-Z0-9_-]+$', pseudo_id):
+    if not _PSEUDO_ID_RE.match(pseudo_id):
         raise ValueError(
             "Pseudo ID can only contain letters, numbers, hyphens, and underscores"
         )
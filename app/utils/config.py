@@ -5,10 +5,10 @@ This module handles application settings, environment variables,
 and configuration validation using Pydantic.
 """
 
-from typing import List
-from pydantic import BaseModel, Field
+from typing import Tuple
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from functools import lru_cache
+from functools import cached_property, lru_cache
 import os
 
 
@@ -33,18 +33,24 @@ class Settings(BaseSettings):
     
     # Server settings
     host: str = Field(default="0.0.0.0", description="Server host")
-    port: int = Field(default=8000, description="Server port")    # CORS settings
+    port: int = Field(default=8000, description="Server port")
+    workers: int = Field(
+        default=max(1, os.cpu_count() or 1),
+        description="Number of server worker processes (ignored in debug/reload mode)"
+    )
+    
+    # CORS settings
     allowed_origins: str = Field(
         default="*", 
         description="Allowed CORS origins (comma-separated)"
     )
     
-    @property
-    def cors_origins(self) -> List[str]:
-        """Parse CORS origins from environment variable."""
+    @cached_property
+    def cors_origins(self) -> Tuple[str, ...]:
+        """Parse CORS origins from environment variable (once)."""
         if self.allowed_origins == "*":
-            return ["*"]
-        return [origin.strip() for origin in self.allowed_origins.split(",")]
+            return ("*",)
+        return tuple(origin.strip() for origin in self.allowed_origins.split(","))
     
     # Security settings
     secret_key: str = Field(
@@ -52,12 +58,45 @@ class Settings(BaseSettings):
         description="Secret key for encryption"
     )
     
+    # Serve random bytes for JWE nonces from an in-process buffer that
+    # is refilled from os.urandom; keep disabled for strict FIPS deployments
+    buffered_rng: bool = Field(
+        default=False,
+        description="Amortize random number syscalls over multiple encryptions"
+    )
+    
     # Photo settings
     photo_storage_path: str = Field(
         default="photos/",
         description="Path to photo storage directory"
     )
     
+    photo_jpeg_quality: int = Field(
+        default=85,
+        ge=1,
+        le=95,
+        description="JPEG quality used when encoding watermarked photos"
+    )
+    
+    # Photo lookup cache; a TTL of 0 disables caching
+    photo_cache_size: int = Field(
+        default=512,
+        ge=0,
+        description="Maximum number of recent photo lookups kept in memory"
+    )
+    
+    photo_cache_ttl: float = Field(
+        default=60.0,
+        description="Seconds a cached photo lookup stays valid"
+    )
+    
+    # Artificial delay added to mock database lookups; 0 disables it
+    simulate_db_latency_ms: int = Field(
+        default=0,
+        ge=0,
+        description="Simulated database query latency in milliseconds"
+    )
+    
     # Watermark settings
     watermark_text: str = Field(
         default="BOA APP RDW.NL",
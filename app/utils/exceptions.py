@@ -36,9 +36,8 @@ class BOAValidationError(BOABaseException):
         """
         self.field = field
         self.value = value
-        full_message = f"Validation error for field '{field}': {message}"
-        if value is not None:
-            full_message += f" (received: {value})"
+        suffix = f" (received: {value})" if value is not None else ""
+        full_message = f"Validation error for field '{field}': {message}{suffix}"
         super().__init__(full_message, "VALIDATION_ERROR")
 
 
@@ -107,9 +106,8 @@ class BOANotFoundError(BOABaseException):
             resource_type (str): Type of resource not found
             criteria (str, optional): Search criteria used
         """
-        message = f"{resource_type} not found"
-        if criteria:
-            message += f" for criteria: {criteria}"
+        suffix = f" for criteria: {criteria}" if criteria else ""
+        message = f"{resource_type} not found{suffix}"
         super().__init__(message, "NOT_FOUND")
 
 
@@ -0,0 +1,24 @@
+"""
+Pytest configuration for the BOA API test scripts.
+"""
+
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Re-run only the tests that failed last time (--lf) by default."""
+    # With no recorded failures pytest falls back to running everything
+    config.option.lf = True
+
+
+@pytest.fixture(scope="session")
+def ec_p256_jwk():
+    """EC P-256 public key in JWK format, shared by the test scripts."""
+    # A point on the curve, so it can be used for encryption as well
+    return {
+        "kty": "EC",
+        "crv": "P-256",
+        "x": "NjB_LBvIlsEMbqkJYY1cC0ZFKZ3ISC6CtvADYhX53zQ",
+        "y": "WPUY5Dq7qT_kJP3U4EYm70BzRRnyMTTXhQsXpHSdkKQ"
+    }
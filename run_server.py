@@ -10,16 +10,21 @@ import sys
 
 def main():
     """Start the BOA API server"""
-    print("🚀 Starting BOA API Server...")
-    print("=" * 50)
-    print("Server will be available at:")
-    print("  • Main API: http://localhost:8000")
-    print("  • Health Check: http://localhost:8000/health")
-    print("  • API Docs: http://localhost:8000/docs")
-    print("  • ReDoc: http://localhost:8000/redoc")
-    print("=" * 50)
-    print("Press Ctrl+C to stop the server")
-    print()
+    # Startup banner, written to stdout in one go
+    banner = "\n".join([
+        "🚀 Starting BOA API Server...",
+        "=" * 50,
+        "Server will be available at:",
+        "  • Main API: http://localhost:8000",
+        "  • Health Check: http://localhost:8000/health",
+        "  • API Docs: http://localhost:8000/docs",
+        "  • ReDoc: http://localhost:8000/redoc",
+        "=" * 50,
+        "Press Ctrl+C to stop the server",
+        "",
+    ])
+    sys.stdout.write(banner + "\n")
+    sys.stdout.flush()
     
     try:
         # Import and run uvicorn
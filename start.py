@@ -5,6 +5,7 @@ Startup script for BOA API application.
 This script starts the FastAPI application using Uvicorn with proper configuration.
 """
 
+import sys
 import uvicorn
 from app.main import app
 from app.utils.config import get_settings
@@ -12,18 +13,40 @@ from app.utils.config import get_settings
 if __name__ == "__main__":
     settings = get_settings()
     
-    print(f"Starting {settings.app_name}")
-    print(f"Environment: {settings.environment}")
-    print(f"Debug mode: {settings.debug}")
-    print(f"Server: http://{settings.host}:{settings.port}")
-    print(f"Documentation: http://{settings.host}:{settings.port}/docs")
-    print("-" * 50)
+    # Startup banner, written to stdout in one go
+    banner = "\n".join([
+        f"Starting {settings.app_name}",
+        f"Environment: {settings.environment}",
+        f"Debug mode: {settings.debug}",
+        f"Server: http://{settings.host}:{settings.port}",
+        f"Documentation: http://{settings.host}:{settings.port}/docs",
+        "-" * 50,
+    ])
+    sys.stdout.write(banner + "\n")
+    sys.stdout.flush()
     
-    uvicorn.run(
-        "app.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.debug,
-        log_level="debug" if settings.debug else "info",
-        access_log=True
-    )
+    if settings.environment == "development":
+        uvicorn.run(
+            "app.main:app",
+            host=settings.host,
+            port=settings.port,
+            reload=settings.debug,
+            log_level="debug" if settings.debug else "info",
+            access_log=True
+        )
+    else:
+        # Production: one process per CPU (settings.workers). loop/http
+        # "auto" select uvloop and httptools (installed with uvicorn[standard])
+        # and fall back to asyncio/h11 where unavailable, e.g. on Windows.
+        # Multiple workers cannot be combined with auto-reload.
+        uvicorn.run(
+            "app.main:app",
+            host=settings.host,
+            port=settings.port,
+            reload=False,
+            workers=settings.workers,
+            loop="auto",
+            http="auto",
+            log_level="debug" if settings.debug else "info",
+            access_log=True
+        )
@@ -1,82 +1,83 @@
 #!/usr/bin/env python3
 """
-Quick API test script to verify endpoints work
+API tests for the BOA endpoints, run in-process with TestClient
 """
 
-import requests
-import json
-import time
-import subprocess
-import sys
-from threading import Thread
+import base64
+import io
+import uuid
 
-def start_server():
-    """Start the FastAPI server in background"""
-    try:
-        subprocess.run([
-            sys.executable, "-m", "uvicorn", 
-            "app.main:app", 
-            "--host", "0.0.0.0", 
-            "--port", "8000",
-            "--reload"
-        ], check=True)
-    except KeyboardInterrupt:
-        pass
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
 
-def test_api_endpoints():
-    """Test API endpoints"""
-    base_url = "http://localhost:8000"
+from app.main import app
+from app.services.crypto import decrypt_photo_from_jwe, generate_ephemeral_keypair
+
+PASFOTO_URL = "/api/boa/rijbewijs/pasfoto"
+
+@pytest.fixture(scope="module")
+def client():
+    """In-process client for the application"""
+    return TestClient(app)
+
+def _photo_request(public_key, bsn="123456782", birth_date="2000-08-16"):
+    """Build a pasfoto request body"""
+    return {
+        "BSN": bsn,
+        "geboortedatum": birth_date,
+        "pseudo-id-boa": "Boa-123",
+        "ontvanger-publieke-sleutel": public_key
+    }
+
+def test_health_endpoint(client):
+    """The health endpoint reports a healthy service"""
+    response = client.get("/health")
     
-    print("🔍 Testing API endpoints...")
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+
+def test_valid_photo_request(client):
+    """A known BSN and birth date return an encrypted, watermarked photo"""
+    private_jwk, public_jwk = generate_ephemeral_keypair()
+    response = client.post(PASFOTO_URL, json=_photo_request(public_jwk))
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {"transactie-id", "pasfoto-id", "pasfoto-jwe"}
+    assert str(uuid.UUID(body["transactie-id"])) == body["transactie-id"]
+    assert body["pasfoto-id"] == 1
     
-    # Wait for server to start
-    time.sleep(2)
+    payload = decrypt_photo_from_jwe(body["pasfoto-jwe"], private_jwk)
+    assert payload["format"] == "jpg"
+    assert payload["encoding"] == "base64"
+    assert Image.open(io.BytesIO(base64.b64decode(payload["pasfoto"]))).format == "JPEG"
+
+def test_invalid_bsn_checksum_returns_422(client, ec_p256_jwk):
+    """A well-formed BSN that fails the 11-proef is a validation error"""
+    response = client.post(PASFOTO_URL, json=_photo_request(ec_p256_jwk, bsn="123456789"))
     
-    try:
-        # Test health endpoint
-        print("\n📊 Testing health endpoint...")
-        response = requests.get(f"{base_url}/health", timeout=5)
-        print(f"Status: {response.status_code}")
-        print(f"Response: {response.json()}")
-        
-        # Test OpenAPI docs endpoint
-        print("\n📚 Testing OpenAPI docs...")
-        response = requests.get(f"{base_url}/openapi.json", timeout=5)
-        print(f"Status: {response.status_code}")
-        print(f"Docs available: {response.status_code == 200}")
-        
-        # Test photo endpoint with invalid data (should get validation error)
-        print("\n📸 Testing photo endpoint (validation error expected)...")
-        test_data = {
-            "BSN": "invalid_bsn",
-            "geboortedatum": "invalid_date",
-            "publieke_sleutel": {}
-        }
-        response = requests.post(
-            f"{base_url}/api/boa/rijbewijs/pasfoto",
-            json=test_data,
-            timeout=5
-        )
-        print(f"Status: {response.status_code}")
-        print(f"Response: {response.json()}")
-        
-        print("\n✅ All endpoint tests completed!")
-        
-    except requests.exceptions.ConnectionError:
-        print("❌ Could not connect to server. Make sure it's running on port 8000.")
-    except requests.exceptions.Timeout:
-        print("❌ Request timed out.")
-    except Exception as e:
-        print(f"❌ Error testing endpoints: {e}")
+    assert response.status_code == 422
+    assert response.json()["type"] == "validation_error"
 
-if __name__ == "__main__":
-    print("🚀 Starting BOA API server test...")
-    print("Note: This will try to connect to a running server on localhost:8000")
-    print("If no server is running, please start it manually with:")
-    print("  python3 -m uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload")
-    print()
+def test_malformed_request_returns_422(client):
+    """Malformed fields are rejected by request validation"""
+    response = client.post(PASFOTO_URL, json={
+        "BSN": "invalid_bsn",
+        "geboortedatum": "invalid_date",
+        "publieke_sleutel": {}
+    })
     
-    # Give user a moment to read the message
-    time.sleep(3)
+    assert response.status_code == 422
+    body = response.json()
+    assert body["type"] == "request_validation_error"
+    assert {error["loc"][-1] for error in body["details"]} >= {"BSN", "geboortedatum"}
+
+def test_unknown_photo_returns_404(client, ec_p256_jwk):
+    """A valid BSN without a photo for the birth date is not found"""
+    response = client.post(PASFOTO_URL, json=_photo_request(ec_p256_jwk, birth_date="2001-08-16"))
     
-    test_api_endpoints()
+    assert response.status_code == 404
+    body = response.json()
+    assert body["type"] == "not_found_error"
+    assert "123456782" in body["message"]
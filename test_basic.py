@@ -3,97 +3,88 @@
 Test script to verify BOA API basic functionality.
 """
 
-import sys
-sys.path.append('.')
+from datetime import date
 
-from app.services.validation import validate_bsn, validate_birth_date, validate_public_key
+import numpy as np
+import pytest
 
+from app.services.validation import (
+    is_valid_birth_date,
+    is_valid_bsn,
+    validate_bsn,
+    validate_bsn_batch,
+    validate_birth_date,
+    validate_public_key
+)
+from app.utils.exceptions import BOAValidationError
 
-def test_bsn_validation():
-    """Test BSN validation with 11-proef."""
-    print("Testing BSN validation...")
-    
-    # Valid BSN (passes 11-proef)
-    try:
-        result = validate_bsn("123456782")
-        print(f"✓ Valid BSN test passed: {result}")
-    except Exception as e:
-        print(f"✗ Valid BSN test failed: {e}")
-    
-    # Invalid BSN (fails 11-proef)
-    try:
-        result = validate_bsn("123456789")
-        print(f"✗ Invalid BSN test should have failed but passed: {result}")
-    except Exception as e:
-        print(f"✓ Invalid BSN test correctly failed: {e}")
 
+# (validator, input, expected to pass)
+CASES = [
+    (validate_bsn, "123456782", True),            # passes 11-proef
+    (validate_bsn, "123456789", False),           # fails 11-proef
+    (validate_birth_date, "2000-08-16", True),    # full date
+    (validate_birth_date, "1995-00-00", True),    # year only
+    (validate_birth_date, "2000-13-45", False),   # no such month/day
+]
 
-def test_date_validation():
-    """Test birth date validation."""
-    print("\nTesting date validation...")
-    
-    # Valid full date
-    try:
-        result = validate_birth_date("2000-08-16")
-        print(f"✓ Valid date test passed: {result}")
-    except Exception as e:
-        print(f"✗ Valid date test failed: {e}")
-    
-    # Valid year-only date
-    try:
-        result = validate_birth_date("1995-00-00")
-        print(f"✓ Valid year-only date test passed: {result}")
-    except Exception as e:
-        print(f"✗ Valid year-only date test failed: {e}")
-    
-    # Invalid date
-    try:
-        result = validate_birth_date("2000-13-45")
-        print(f"✗ Invalid date test should have failed but passed: {result}")
-    except Exception as e:
-        print(f"✓ Invalid date test correctly failed: {e}")
 
+@pytest.mark.parametrize("fn,arg,ok", CASES)
+def test_validator(fn, arg, ok):
+    """Test BSN and birth date validation."""
+    if ok:
+        assert fn(arg) is True
+    else:
+        with pytest.raises(BOAValidationError):
+            fn(arg)
 
-def test_public_key_validation():
-    """Test public key validation."""
-    print("\nTesting public key validation...")
+
+def test_bsn_batch_matches_single():
+    """Test that batch 11-proef agrees with validate_bsn on random BSNs."""
+    digits = np.random.default_rng(11).integers(0, 10, size=(100_000, 9), dtype=np.int8)
+    batch = validate_bsn_batch(digits)
     
-    # Valid public key
-    valid_key = {
-        "kty": "EC",
-        "crv": "P-256",
-        "x": "NjB_LBvIlsEMbqkJYY1cC0ZFKZ3ISC6CtvADYhX53zQ",
-        "y": "WPUY5Dq7qT_kJP3U4EYm70BzRRnyMTTXhQsXpHSdkKQ"
-    }
+    # ASCII rows of 9 bytes each
+    raw = (digits + 48).astype(np.uint8).tobytes()
+    single = [is_valid_bsn(raw[i:i + 9].decode('ascii')) for i in range(0, len(raw), 9)]
     
+    assert batch.tolist() == single
+
+
+def _reference_birth_date_ok(year, month, day):
+    """Decide validity of a birth date straight from the calendar."""
+    if month == 0 and day == 0:
+        return 1900 <= year <= date.today().year
     try:
-        result = validate_public_key(valid_key)
-        print(f"✓ Valid public key test passed: {result}")
-    except Exception as e:
-        print(f"✗ Valid public key test failed: {e}")
-    
-    # Invalid public key (wrong type)
-    invalid_key = {
-        "kty": "RSA",
-        "crv": "P-256",
-        "x": "NjB_LBvIlsEMbqkJYY1cC0ZFKZ3ISC6CtvADYhX53zQ",
-        "y": "WPUY5Dq7qT_kJP3U4EYm70BzRRnyMTTXhQsXpHSdkKQ"
-    }
+        return date(year, month, day) <= date.today()
+    except ValueError:
+        return False
+
+
+def test_birth_date_fuzz():
+    """Test validate_birth_date on many random, partly invalid dates."""
+    rng = np.random.default_rng(16)
+    years = rng.integers(1890, 2040, size=20_000)
+    months = rng.integers(0, 14, size=20_000)
+    days = rng.integers(0, 33, size=20_000)
     
-    try:
-        result = validate_public_key(invalid_key)
-        print(f"✗ Invalid public key test should have failed but passed: {result}")
-    except Exception as e:
-        print(f"✓ Invalid public key test correctly failed: {e}")
+    for year, month, day in zip(years.tolist(), months.tolist(), days.tolist()):
+        date_str = f"{year:04d}-{month:02d}-{day:02d}"
+        assert is_valid_birth_date(date_str) == _reference_birth_date_ok(year, month, day), date_str
 
 
-if __name__ == "__main__":
-    print("BOA API Validation Tests")
-    print("=" * 50)
+def test_public_key_validation(ec_p256_jwk):
+    """Test public key validation."""
+    assert validate_public_key(ec_p256_jwk) is True
     
-    test_bsn_validation()
-    test_date_validation()
-    test_public_key_validation()
+    # Wrong key type
+    with pytest.raises(BOAValidationError):
+        validate_public_key({**ec_p256_jwk, "kty": "RSA"})
     
-    print("\n" + "=" * 50)
-    print("Test completed!")
+    # Well-formed coordinates that are not a point on P-256
+    with pytest.raises(BOAValidationError):
+        validate_public_key({
+            **ec_p256_jwk,
+            "x": "trWJsTfJIgLuu7QbgK51Dbj3G9HMhfiUv7QxYdAtfOQ",
+            "y": "XbFMixw5LyNFjIOWIXBJmd1Fign36IycjBKRqwxKT_Q"
+        })
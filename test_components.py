@@ -3,112 +3,317 @@
 Test script for BOA API endpoints
 """
 
+import asyncio
+import base64
+import gc
+import io
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
 from app.main import app
-import json
+from app.services.validation import validate_bsn, validate_birth_date, validate_public_key
+from app.services.crypto import (
+    encrypt_photo_as_jwe,
+    encrypt_photo_bytes_as_jwe,
+    decrypt_photo_from_jwe,
+    generate_ephemeral_keypair,
+    validate_public_key_jwk
+)
+import numpy as np
+
+from app.services.photo_processing import (
+    add_invisible_watermark,
+    add_watermark_to_photo_bytes,
+    extract_invisible_watermark
+)
+from app.services import photo_processing, photo_service
+from app.services.photo_service import create_sample_photo_base64
+from app.utils.exceptions import BOAValidationError, PhotoNotFoundError
 
 def test_health_endpoint():
     """Test the health endpoint directly."""
-    # Test application creation
-    print("✓ FastAPI app created successfully")
-    
-    # Check if routes are registered
-    routes = [route.path for route in app.routes]
-    print(f"✓ Registered routes: {routes}")
+    # Check if routes are registered (one pass over app.routes)
+    paths = {getattr(route, 'path', None): route for route in app.routes}
     
     # Check if health endpoint exists
-    health_routes = [route for route in app.routes if hasattr(route, 'path') and route.path == '/health']
-    if health_routes:
-        print("✓ Health endpoint registered")
-    else:
-        print("✗ Health endpoint not found")
-      # Check photo endpoint
-    photo_routes = [route for route in app.routes if hasattr(route, 'path') and 'pasfoto' in route.path]
-    if photo_routes:
-        print(f"✓ Photo endpoint registered: {photo_routes[0].path}")
-    else:
-        print("✗ Photo endpoint not found")
-
-def test_validation_service():
+    assert '/health' in paths
+    
+    # Check photo endpoint
+    assert any(path and 'pasfoto' in path for path in paths)
+
+def test_validation_service(ec_p256_jwk):
     """Test validation services."""
-    try:
-        from app.services.validation import validate_bsn, validate_birth_date, validate_public_key
-          # Test BSN validation
-        try:
-            valid_bsn = validate_bsn("123456782")  # Valid test BSN
-            print(f"✓ BSN validation works: valid BSN accepted")
-        except Exception:
-            print("✗ Valid BSN was rejected")
-            
-        try:
-            invalid_bsn = validate_bsn("123456789")  # Invalid BSN
-            print("✗ Invalid BSN was accepted")
-        except Exception:
-            print("✓ BSN validation works: invalid BSN rejected")
-          # Test date validation  
-        try:
-            valid_date = validate_birth_date("2023-01-01")
-            print(f"✓ Date validation works: valid date accepted")
-        except Exception:
-            print("✗ Valid date was rejected")
-            
-        try:
-            invalid_date = validate_birth_date("2023-13-01")
-            print("✗ Invalid date was accepted")
-        except Exception:
-            print("✓ Date validation works: invalid date rejected")
-        
-        # Test public key validation
-        test_jwk = {
-            "kty": "EC",
-            "crv": "P-256",
-            "x": "trWJsTfJIgLuu7QbgK51Dbj3G9HMhfiUv7QxYdAtfOQ",
-            "y": "XbFMixw5LyNFjIOWIXBJmd1Fign36IycjBKRqwxKT_Q"
-        }
-        valid_key = validate_public_key(test_jwk)
-        print(f"✓ Public key validation works: {valid_key}")
-        
-    except Exception as e:
-        print(f"✗ Validation service error: {e}")
+    # Test BSN validation
+    assert validate_bsn("123456782")  # Valid test BSN
+    with pytest.raises(BOAValidationError):
+        validate_bsn("123456789")  # Invalid BSN
+    
+    # Test date validation
+    assert validate_birth_date("2023-01-01")
+    with pytest.raises(BOAValidationError):
+        validate_birth_date("2023-13-01")
+    
+    # Test public key validation
+    assert validate_public_key(ec_p256_jwk)
 
-def test_crypto_service():
+def test_crypto_service(ec_p256_jwk):
     """Test crypto services."""
-    try:
-        from app.services.crypto import encrypt_photo_as_jwe, validate_public_key_jwk
-        
-        test_payload = {
-            "pasfoto": "base64data",
-            "format": "jpg", 
-            "encoding": "base64"
-        }
-        
-        test_public_key = {
-            "kty": "EC",
-            "crv": "P-256",
-            "x": "trWJsTfJIgLuu7QbgK51Dbj3G9HMhfiUv7QxYdAtfOQ",
-            "y": "XbFMixw5LyNFjIOWIXBJmd1Fign36IycjBKRqwxKT_Q"
-        }
-        
-        # Test key validation
-        valid_key = validate_public_key_jwk(test_public_key)
-        print(f"✓ Crypto key validation works: {valid_key}")
-        
-        # Test encryption (simplified version)
-        jwe_token = encrypt_photo_as_jwe(test_payload, test_public_key)
-        print(f"✓ Photo encryption works: token length = {len(jwe_token)}")
+    test_payload = {
+        "pasfoto": "base64data",
+        "format": "jpg", 
+        "encoding": "base64"
+    }
+    
+    # Test key validation
+    assert validate_public_key_jwk(ec_p256_jwk)
+    
+    # Test encryption (compact serialization has five parts)
+    jwe_token = encrypt_photo_as_jwe(test_payload, ec_p256_jwk)
+    assert jwe_token.count('.') == 4
+    
+    # Test ECDH-ES round trip with a generated key pair
+    private_jwk, public_jwk = generate_ephemeral_keypair()
+    jwe_token = encrypt_photo_as_jwe(test_payload, public_jwk)
+    assert decrypt_photo_from_jwe(jwe_token, private_jwk) == test_payload
+    
+    # Raw bytes must produce the same payload shape as the dict variant
+    jwe_token = encrypt_photo_bytes_as_jwe(b"photo-bytes", public_jwk)
+    assert decrypt_photo_from_jwe(jwe_token, private_jwk) == {
+        "pasfoto": "cGhvdG8tYnl0ZXM=",
+        "format": "jpg",
+        "encoding": "base64"
+    }
+
+def test_photo_processing():
+    """Test photo processing services."""
+    # Invisible watermark needs enough pixels for the ID plus end marker
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 40), (120, 80, 40)).save(buffer, format='PNG')
+    photo_data = base64.b64encode(buffer.getvalue()).decode('ascii')
+    
+    transaction_id = "7bdba0d1-bc9b-4e2a-b69e-4308a8373d32"
+    stegged = add_invisible_watermark(photo_data, transaction_id)
+    assert extract_invisible_watermark(stegged) == transaction_id
+    
+    # Unmarked photos carry no watermark
+    assert extract_invisible_watermark(create_sample_photo_base64()) is None
+
+def _encode_image(image, image_format='PNG'):
+    """Encode a Pillow image to raw bytes."""
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+def _watermark(image, image_format='PNG'):
+    """Watermark an image and decode the result."""
+    watermarked = add_watermark_to_photo_bytes(_encode_image(image, image_format), "7bdba0d1")
+    return Image.open(io.BytesIO(watermarked))
+
+def test_visible_watermark_keeps_size_and_mode():
+    """Test that watermarked photos are RGB JPEGs of the original size."""
+    result = _watermark(Image.new('RGB', (300, 200), (120, 80, 40)), 'JPEG')
+    assert result.format == 'JPEG'
+    assert result.mode == 'RGB'
+    assert result.size == (300, 200)
+
+def test_visible_watermark_marks_bottom_right():
+    """Test that only the watermark corner of the photo changes."""
+    original = Image.new('RGB', (300, 200), (200, 200, 200))
+    result = np.asarray(_watermark(original), dtype=np.int16)
+    difference = np.abs(result - np.asarray(original, dtype=np.int16))
+    
+    # Default position is bottom-right with a 10 pixel margin
+    assert difference[-40:-10, -80:-10].mean() > 30
+    assert difference[:100, :150].max() <= 3
+
+@pytest.mark.parametrize("text", ["7bdba0d1", "0123abcd", "fe-9c8a7"])
+def test_composed_watermark_line_matches_direct_rendering(text):
+    """Test that a line built from cached glyphs looks like drawing it at once."""
+    composed = np.asarray(photo_processing._compose_watermark_line(text), dtype=np.int16)
+    direct = np.asarray(photo_processing._rasterize_watermark_text(text), dtype=np.int16)
+    
+    # Widths can differ by the rounding of the summed advances
+    width = max(composed.shape[1], direct.shape[1])
+    composed = np.pad(composed, ((0, 0), (0, width - composed.shape[1])))
+    direct = np.pad(direct, ((0, 0), (0, width - direct.shape[1])))
+    
+    assert abs(int(composed.sum()) - int(direct.sum())) <= direct.sum() // 100
+    assert np.abs(composed - direct).max() <= 8
+
+@pytest.mark.parametrize("mode,size", [
+    ('RGB', (1, 1)),
+    ('RGBA', (120, 90)),
+    ('P', (120, 90)),
+    ('L', (120, 90)),
+])
+def test_visible_watermark_input_modes(mode, size):
+    """Test tiny and non-RGB photos are watermarked into RGB JPEGs."""
+    result = _watermark(Image.new(mode, size))
+    assert result.format == 'JPEG'
+    assert result.mode == 'RGB'
+    assert result.size == size
+
+@pytest.mark.parametrize("mode,image_format", [
+    ('RGBA', 'PNG'),
+    ('LA', 'PNG'),
+    ('PA', 'TIFF'),
+])
+def test_visible_watermark_flattens_alpha(mode, image_format):
+    """Test that transparent areas end up white rather than their color."""
+    image = Image.new(mode, (120, 90))
+    if mode == 'PA':
+        image.putpalette([255, 0, 0] * 256)
+    
+    result = _watermark(image, image_format)
+    assert all(channel >= 250 for channel in result.getpixel((0, 0)))
+
+@pytest.fixture
+def photo_lookups(monkeypatch):
+    """Count mock database queries, starting from an empty photo cache."""
+    calls = []
+    find_photo = photo_service._find_photo
+    
+    def counting_find_photo(bsn, birth_date):
+        calls.append((bsn, birth_date))
+        return find_photo(bsn, birth_date)
+    
+    monkeypatch.setattr(photo_service, "_find_photo", counting_find_photo)
+    monkeypatch.setattr(photo_service.settings, "photo_cache_ttl", 60.0)
+    monkeypatch.setattr(photo_service.settings, "simulate_db_latency_ms", 0)
+    photo_service.clear_photo_cache()
+    yield calls
+    photo_service.clear_photo_cache()
+
+def test_photo_cache_ttl_expiry(photo_lookups, monkeypatch):
+    """Test that cached lookups are served until their TTL runs out."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(photo_service, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    
+    lookup = photo_service.get_photo_by_criteria("123456782", "2000-08-16")
+    assert asyncio.run(lookup)[1] == 1
+    asyncio.run(photo_service.get_photo_by_criteria("123456782", "2000-08-16"))
+    assert len(photo_lookups) == 1
+    
+    clock.now += 61
+    asyncio.run(photo_service.get_photo_by_criteria("123456782", "2000-08-16"))
+    assert len(photo_lookups) == 2
+
+def test_photo_cache_lru_eviction(photo_lookups, monkeypatch):
+    """Test that the least recently used lookup is evicted first."""
+    monkeypatch.setattr(photo_service.settings, "photo_cache_size", 2)
+    
+    async def lookup(*keys):
+        for key in keys:
+            await photo_service.get_photo_by_criteria(*key)
+    
+    first = ("123456782", "2000-08-16")
+    second = ("123456782", "1995-00-00")
+    third = ("987654329", "1985-12-25")
+    
+    # Touch the first entry again, so the second is the oldest on insert
+    asyncio.run(lookup(first, second, first, third))
+    assert photo_lookups == [first, second, third]
+    
+    asyncio.run(lookup(first, third, second))
+    assert photo_lookups == [first, second, third, second]
+
+def test_concurrent_lookups_share_one_query(photo_lookups, monkeypatch):
+    """Test that concurrent lookups for the same key query the database once."""
+    monkeypatch.setattr(photo_service.settings, "simulate_db_latency_ms", 20)
+    
+    async def lookup_concurrently():
+        return await asyncio.gather(*(
+            photo_service.get_photo_bytes_by_criteria("987654329", "1985-12-25")
+            for _ in range(5)
+        ))
+    
+    results = asyncio.run(lookup_concurrently())
+    assert len(photo_lookups) == 1
+    assert all(result == results[0] for result in results)
+    assert results[0][1] == 3
+    assert not photo_service._pending_lookups
+
+def test_cancelled_not_found_lookup_is_retrieved(photo_lookups, monkeypatch):
+    """Test that a not-found lookup whose waiters were cancelled is not reported."""
+    monkeypatch.setattr(photo_service.settings, "simulate_db_latency_ms", 20)
+    reported = []
+    
+    async def cancel_lookup():
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: reported.append(context)
+        )
+        waiter = asyncio.ensure_future(
+            photo_service.get_photo_by_criteria("123456782", "2001-01-01")
+        )
+        await asyncio.sleep(0)
+        waiter.cancel()
         
-    except Exception as e:
-        print(f"✗ Crypto service error: {e}")
+        # Let the shared lookup fail, then collect it
+        await asyncio.sleep(0.05)
+        gc.collect()
+    
+    asyncio.run(cancel_lookup())
+    assert len(photo_lookups) == 1
+    assert not reported
+    assert not photo_service._pending_lookups
+    
+    with pytest.raises(PhotoNotFoundError):
+        asyncio.run(photo_service.get_photo_by_criteria("123456782", "2001-01-01"))
+
+@pytest.fixture
+def mock_database(monkeypatch):
+    """Run against a copy of the mock photo database and its derived state."""
+    monkeypatch.setattr(photo_service, "MOCK_PHOTO_DATABASE", {
+        bsn: dict(records) for bsn, records in photo_service.MOCK_PHOTO_DATABASE.items()
+    })
+    monkeypatch.setattr(photo_service, "_PHOTO_BY_ID", dict(photo_service._PHOTO_BY_ID))
+    monkeypatch.setattr(photo_service, "_PHOTO_BYTES", dict(photo_service._PHOTO_BYTES))
+    monkeypatch.setattr(photo_service, "_total_photos", photo_service._total_photos)
+    monkeypatch.setattr(photo_service, "_bsn_keys", None)
+    return photo_service
+
+def test_replacing_photo_updates_id_index(mock_database, photo_lookups):
+    """Test that replacing a record drops the old ID and serves the new photo."""
+    old_photo = base64.b64encode(_encode_image(Image.new('RGB', (8, 8), (255, 0, 0)))).decode('ascii')
+    new_photo = base64.b64encode(_encode_image(Image.new('RGB', (8, 8), (0, 0, 255)))).decode('ascii')
+    
+    mock_database.add_mock_photo("111222333", "2001-01-01", old_photo, 10)
+    assert mock_database.get_photo_by_id(10) == old_photo
+    
+    # Cache the old record, then replace it under a new ID
+    lookup = mock_database.get_photo_bytes_by_criteria("111222333", "2001-01-01")
+    assert asyncio.run(lookup) == (base64.b64decode(old_photo), 10)
+    mock_database.add_mock_photo("111222333", "2001-01-01", new_photo, 11)
+    
+    assert mock_database.get_photo_by_id(10) is None
+    assert 10 not in mock_database._PHOTO_BYTES
+    assert mock_database.get_photo_by_id(11) == new_photo
+    
+    lookup = mock_database.get_photo_bytes_by_criteria("111222333", "2001-01-01")
+    assert asyncio.run(lookup) == (base64.b64decode(new_photo), 11)
 
-if __name__ == "__main__":
-    print("🚀 Testing BOA API Components\n")
+def test_database_stats_follow_inserts(mock_database):
+    """Test that counts and BSNs are updated for new records only."""
+    photo = create_sample_photo_base64()
+    bsns = ("123456782", "987654329", "147258369")
+    assert mock_database.get_database_stats()["available_bsns"] == bsns
     
-    test_health_endpoint()
-    print()
+    def assert_stats(total_photos, available_bsns):
+        stats = mock_database.get_database_stats()
+        assert stats["total_photos"] == total_photos
+        assert stats["total_bsn_records"] == len(available_bsns)
+        assert stats["available_bsns"] == available_bsns
     
-    test_validation_service()
-    print()
+    # New BSN
+    mock_database.add_mock_photo("111222333", "2001-01-01", photo, 10)
+    assert_stats(5, bsns + ("111222333",))
     
-    test_crypto_service()
-    print()
+    # Second birth date for an existing BSN
+    mock_database.add_mock_photo("987654329", "1990-02-02", photo, 11)
+    assert_stats(6, bsns + ("111222333",))
     
-    print("✅ Component testing completed!")
+    # Replacement of an existing pair
+    mock_database.add_mock_photo("123456782", "2000-08-16", photo, 12)
+    assert_stats(6, bsns + ("111222333",))